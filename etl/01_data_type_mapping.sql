@@ -32,7 +32,9 @@ GUID Conversion Strategy:
 CREATE SCHEMA IF NOT EXISTS migration_staging;
 
 -- Staging table for SQL Server data with original structure
-CREATE TABLE migration_staging.raw_aktenzeichen (
+-- Staging tables are UNLOGGED: they are reloaded from the extract files on
+-- failure, so the bulk COPY does not need to go through WAL
+CREATE UNLOGGED TABLE migration_staging.raw_aktenzeichen (
     az_ID VARCHAR(36),  -- GUID as string for initial import
     az_Bezirk VARCHAR(10),
     az_Nummer INTEGER,
@@ -41,7 +43,7 @@ CREATE TABLE migration_staging.raw_aktenzeichen (
     migration_timestamp TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
-CREATE TABLE migration_staging.raw_antrag (
+CREATE UNLOGGED TABLE migration_staging.raw_antrag (
     an_ID VARCHAR(36),
     an_Aktenzeichen VARCHAR(20),
     an_WartelistenNr32 VARCHAR(20),
@@ -77,14 +79,14 @@ CREATE TABLE migration_staging.raw_antrag (
     migration_timestamp TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
-CREATE TABLE migration_staging.raw_bezirk (
+CREATE UNLOGGED TABLE migration_staging.raw_bezirk (
     bez_ID VARCHAR(36),
     bez_Name VARCHAR(10),
     migration_batch_id INTEGER,
     migration_timestamp TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
-CREATE TABLE migration_staging.raw_bezirke_katasterbezirke (
+CREATE UNLOGGED TABLE migration_staging.raw_bezirke_katasterbezirke (
     bez_Name VARCHAR(10),
     kat_Katasterbezirk VARCHAR(10),
     kat_KatasterbezirkName VARCHAR(50),
@@ -92,7 +94,7 @@ CREATE TABLE migration_staging.raw_bezirke_katasterbezirke (
     migration_timestamp TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
-CREATE TABLE migration_staging.raw_eingangsnummer (
+CREATE UNLOGGED TABLE migration_staging.raw_eingangsnummer (
     enr_ID VARCHAR(36),
     enr_Bezirk VARCHAR(10),
     enr_Nummer INTEGER,
@@ -101,7 +103,7 @@ CREATE TABLE migration_staging.raw_eingangsnummer (
     migration_timestamp TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
-CREATE TABLE migration_staging.raw_katasterbezirk (
+CREATE UNLOGGED TABLE migration_staging.raw_katasterbezirk (
     kat_ID VARCHAR(36),
     kat_bez_ID VARCHAR(36),
     kat_Katasterbezirk VARCHAR(10),
@@ -110,7 +112,7 @@ CREATE TABLE migration_staging.raw_katasterbezirk (
     migration_timestamp TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
-CREATE TABLE migration_staging.raw_kennungen (
+CREATE UNLOGGED TABLE migration_staging.raw_kennungen (
     Kenn_ID VARCHAR(36),
     Kenn_Name VARCHAR(50),
     Kenn_Domaene VARCHAR(50),
@@ -119,7 +121,7 @@ CREATE TABLE migration_staging.raw_kennungen (
     migration_timestamp TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
-CREATE TABLE migration_staging.raw_mischenfelder (
+CREATE UNLOGGED TABLE migration_staging.raw_mischenfelder (
     misch_ID VARCHAR(36),
     misch_Datenbankfeld VARCHAR(50),
     misch_Dokumentfeld VARCHAR(50),
@@ -128,7 +130,7 @@ CREATE TABLE migration_staging.raw_mischenfelder (
     migration_timestamp TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
-CREATE TABLE migration_staging.raw_personen (
+CREATE UNLOGGED TABLE migration_staging.raw_personen (
     Pers_ID VARCHAR(36),
     Pers_Anrede VARCHAR(10),
     Pers_Vorname VARCHAR(50),
@@ -153,7 +155,7 @@ CREATE TABLE migration_staging.raw_personen (
     migration_timestamp TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
-CREATE TABLE migration_staging.raw_verlauf (
+CREATE UNLOGGED TABLE migration_staging.raw_verlauf (
     verl_ID VARCHAR(36),
     verl_An_ID VARCHAR(36),
     verl_Art VARCHAR(4),
@@ -177,89 +179,105 @@ CREATE TABLE migration_staging.raw_verlauf (
 CREATE OR REPLACE FUNCTION migration_staging.convert_datetime(
     datetime_string TEXT
 ) RETURNS TIMESTAMP WITH TIME ZONE AS $$
+DECLARE
+    v_value TEXT := TRIM(datetime_string);
 BEGIN
-    IF datetime_string IS NULL OR TRIM(datetime_string) = '' THEN
+    IF v_value IS NULL OR v_value = '' THEN
         RETURN NULL;
     END IF;
     
-    -- Handle various SQL Server datetime formats
-    BEGIN
-        -- Try standard format first: YYYY-MM-DD HH:MM:SS.mmm
+    -- Dispatch on the format first; pg_input_is_valid checks each format
+    -- without the subtransaction an exception block costs per call
+    IF v_value ~ '^\d{4}-\d{1,2}-\d{1,2}' THEN
+        -- Standard format: YYYY-MM-DD HH:MM:SS.mmm
+        IF pg_input_is_valid(v_value, 'timestamp with time zone') THEN
+            RETURN v_value::TIMESTAMP WITH TIME ZONE;
+        END IF;
+    ELSIF v_value ~ '^\d{1,2}\.\d{1,2}\.\d{4}' THEN
+        -- German format: DD.MM.YYYY HH:MM:SS, reordered to YYYY-MM-DD
+        v_value := regexp_replace(v_value, '^(\d{1,2})\.(\d{1,2})\.(\d{4})', '\3-\2-\1');
+        IF pg_input_is_valid(v_value, 'timestamp with time zone') THEN
+            RETURN v_value::TIMESTAMP WITH TIME ZONE;
+        END IF;
+    ELSIF pg_input_is_valid(datetime_string, 'timestamp with time zone') THEN
+        -- Handle other SQL Server datetime formats
         RETURN datetime_string::TIMESTAMP WITH TIME ZONE;
-    EXCEPTION WHEN OTHERS THEN
-        BEGIN
-            -- Try alternative format: DD.MM.YYYY HH:MM:SS
-            RETURN TO_TIMESTAMP(datetime_string, 'DD.MM.YYYY HH24:MI:SS');
-        EXCEPTION WHEN OTHERS THEN
-            -- Log error and return NULL
-            RAISE WARNING 'Could not convert datetime string: %', datetime_string;
-            RETURN NULL;
-        END;
-    END;
+    END IF;
+    
+    -- Log error and return NULL
+    RAISE WARNING 'Could not convert datetime string: %', datetime_string;
+    RETURN NULL;
 END;
 $$ LANGUAGE plpgsql;
 
 -- Convert SQL Server GUID string to PostgreSQL UUID
+-- STABLE so that joins on convert_guid(...) can be planned as hash joins
 CREATE OR REPLACE FUNCTION migration_staging.convert_guid(
     guid_string TEXT
 ) RETURNS UUID AS $$
+DECLARE
+    v_value TEXT := TRIM(guid_string);
 BEGIN
-    IF guid_string IS NULL OR TRIM(guid_string) = '' THEN
+    IF v_value IS NULL OR v_value = '' THEN
         RETURN NULL;
     END IF;
     
-    BEGIN
-        RETURN guid_string::UUID;
-    EXCEPTION WHEN OTHERS THEN
-        RAISE WARNING 'Could not convert GUID string: %', guid_string;
-        RETURN NULL;
-    END;
+    -- Validate without an exception block, which would start a subtransaction per call
+    IF pg_input_is_valid(v_value, 'uuid') THEN
+        RETURN v_value::UUID;
+    END IF;
+    
+    RAISE WARNING 'Could not convert GUID string: %', guid_string;
+    RETURN NULL;
 END;
-$$ LANGUAGE plpgsql;
+$$ LANGUAGE plpgsql STABLE;
 
 -- Convert SQL Server bit/char to PostgreSQL boolean
+-- Plain SQL so the planner can inline it into the calling query
 CREATE OR REPLACE FUNCTION migration_staging.convert_boolean(
     bit_char_value TEXT
 ) RETURNS BOOLEAN AS $$
-BEGIN
-    IF bit_char_value IS NULL THEN
-        RETURN NULL;
-    END IF;
-    
-    CASE UPPER(TRIM(bit_char_value))
-        WHEN '1' THEN RETURN TRUE;
-        WHEN '0' THEN RETURN FALSE;
-        WHEN 'Y' THEN RETURN TRUE;
-        WHEN 'N' THEN RETURN FALSE;
-        WHEN 'J' THEN RETURN TRUE; -- German "Ja"
-        WHEN 'TRUE' THEN RETURN TRUE;
-        WHEN 'FALSE' THEN RETURN FALSE;
-        ELSE RETURN NULL;
-    END CASE;
-END;
-$$ LANGUAGE plpgsql;
+    SELECT CASE UPPER(TRIM(bit_char_value))
+        WHEN '1' THEN TRUE
+        WHEN '0' THEN FALSE
+        WHEN 'Y' THEN TRUE
+        WHEN 'N' THEN FALSE
+        WHEN 'J' THEN TRUE -- German "Ja"
+        WHEN 'TRUE' THEN TRUE
+        WHEN 'FALSE' THEN FALSE
+    END;
+$$ LANGUAGE sql IMMUTABLE;
 
 -- Parse German birth date format to DATE
 CREATE OR REPLACE FUNCTION migration_staging.convert_birth_date(
     birth_date_string TEXT
 ) RETURNS DATE AS $$
+DECLARE
+    v_value TEXT := TRIM(birth_date_string);
 BEGIN
-    IF birth_date_string IS NULL OR TRIM(birth_date_string) = '' THEN
+    IF v_value IS NULL OR v_value = '' THEN
         RETURN NULL;
     END IF;
     
-    BEGIN
-        -- Try DD.MM.YYYY format
-        RETURN TO_DATE(birth_date_string, 'DD.MM.YYYY');
-    EXCEPTION WHEN OTHERS THEN
-        BEGIN
-            -- Try YYYY-MM-DD format
-            RETURN birth_date_string::DATE;
-        EXCEPTION WHEN OTHERS THEN
-            RAISE WARNING 'Could not convert birth date string: %', birth_date_string;
-            RETURN NULL;
-        END;
-    END;
+    IF v_value ~ '^\d{1,2}\.\d{1,2}\.\d{4}' THEN
+        -- DD.MM.YYYY format, reordered to YYYY-MM-DD; anything after the date
+        -- (e.g. a 00:00:00 time) is ignored, as TO_DATE did
+        v_value := regexp_replace(v_value, '^(\d{1,2})\.(\d{1,2})\.(\d{4}).*$', '\3-\2-\1');
+        IF pg_input_is_valid(v_value, 'date') THEN
+            RETURN v_value::DATE;
+        END IF;
+    ELSIF v_value ~ '^\d{4}-\d{1,2}-\d{1,2}$' THEN
+        -- YYYY-MM-DD format
+        IF pg_input_is_valid(v_value, 'date') THEN
+            RETURN v_value::DATE;
+        END IF;
+    ELSIF pg_input_is_valid(birth_date_string, 'date') THEN
+        -- Other date formats from the legacy system
+        RETURN birth_date_string::DATE;
+    END IF;
+    
+    RAISE WARNING 'Could not convert birth date string: %', birth_date_string;
+    RETURN NULL;
 END;
 $$ LANGUAGE plpgsql;
 
@@ -375,16 +393,41 @@ $$ LANGUAGE plpgsql;
 -- INDEXES FOR STAGING TABLES
 -- =============================================================================
 
--- Indexes for performance during migration
-CREATE INDEX idx_raw_aktenzeichen_batch ON migration_staging.raw_aktenzeichen(migration_batch_id);
-CREATE INDEX idx_raw_antrag_batch ON migration_staging.raw_antrag(migration_batch_id);
-CREATE INDEX idx_raw_bezirk_batch ON migration_staging.raw_bezirk(migration_batch_id);
-CREATE INDEX idx_raw_eingangsnummer_batch ON migration_staging.raw_eingangsnummer(migration_batch_id);
-CREATE INDEX idx_raw_katasterbezirk_batch ON migration_staging.raw_katasterbezirk(migration_batch_id);
-CREATE INDEX idx_raw_kennungen_batch ON migration_staging.raw_kennungen(migration_batch_id);
-CREATE INDEX idx_raw_mischenfelder_batch ON migration_staging.raw_mischenfelder(migration_batch_id);
-CREATE INDEX idx_raw_personen_batch ON migration_staging.raw_personen(migration_batch_id);
-CREATE INDEX idx_raw_verlauf_batch ON migration_staging.raw_verlauf(migration_batch_id);
+-- Indexes for performance during migration. The staging load drops them
+-- before COPY and recreates them once all extract files are loaded.
+CREATE OR REPLACE FUNCTION migration_staging.create_staging_indexes()
+RETURNS VOID AS $$
+BEGIN
+    PERFORM set_config('maintenance_work_mem', '512MB', true);
+
+    CREATE INDEX IF NOT EXISTS idx_raw_aktenzeichen_batch ON migration_staging.raw_aktenzeichen(migration_batch_id);
+    CREATE INDEX IF NOT EXISTS idx_raw_antrag_batch ON migration_staging.raw_antrag(migration_batch_id);
+    CREATE INDEX IF NOT EXISTS idx_raw_bezirk_batch ON migration_staging.raw_bezirk(migration_batch_id);
+    CREATE INDEX IF NOT EXISTS idx_raw_eingangsnummer_batch ON migration_staging.raw_eingangsnummer(migration_batch_id);
+    CREATE INDEX IF NOT EXISTS idx_raw_katasterbezirk_batch ON migration_staging.raw_katasterbezirk(migration_batch_id);
+    CREATE INDEX IF NOT EXISTS idx_raw_kennungen_batch ON migration_staging.raw_kennungen(migration_batch_id);
+    CREATE INDEX IF NOT EXISTS idx_raw_mischenfelder_batch ON migration_staging.raw_mischenfelder(migration_batch_id);
+    CREATE INDEX IF NOT EXISTS idx_raw_personen_batch ON migration_staging.raw_personen(migration_batch_id);
+    CREATE INDEX IF NOT EXISTS idx_raw_verlauf_batch ON migration_staging.raw_verlauf(migration_batch_id);
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION migration_staging.drop_staging_indexes()
+RETURNS VOID AS $$
+BEGIN
+    DROP INDEX IF EXISTS migration_staging.idx_raw_aktenzeichen_batch;
+    DROP INDEX IF EXISTS migration_staging.idx_raw_antrag_batch;
+    DROP INDEX IF EXISTS migration_staging.idx_raw_bezirk_batch;
+    DROP INDEX IF EXISTS migration_staging.idx_raw_eingangsnummer_batch;
+    DROP INDEX IF EXISTS migration_staging.idx_raw_katasterbezirk_batch;
+    DROP INDEX IF EXISTS migration_staging.idx_raw_kennungen_batch;
+    DROP INDEX IF EXISTS migration_staging.idx_raw_mischenfelder_batch;
+    DROP INDEX IF EXISTS migration_staging.idx_raw_personen_batch;
+    DROP INDEX IF EXISTS migration_staging.idx_raw_verlauf_batch;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT migration_staging.create_staging_indexes();
 
 -- Indexes for migration log
 CREATE INDEX idx_migration_log_batch_table ON migration_staging.migration_log(batch_id, table_name);
@@ -395,6 +438,8 @@ CREATE INDEX idx_migration_log_status ON migration_staging.migration_log(status)
 -- =============================================================================
 
 COMMENT ON SCHEMA migration_staging IS 'Staging schema for SQL Server to PostgreSQL migration';
+COMMENT ON FUNCTION migration_staging.create_staging_indexes() IS 'Creates the batch indexes on the staging tables after bulk load';
+COMMENT ON FUNCTION migration_staging.drop_staging_indexes() IS 'Drops the batch indexes on the staging tables before bulk load';
 COMMENT ON FUNCTION migration_staging.convert_datetime(TEXT) IS 'Converts SQL Server datetime strings to PostgreSQL timestamps';
 COMMENT ON FUNCTION migration_staging.convert_guid(TEXT) IS 'Converts SQL Server GUID strings to PostgreSQL UUIDs';
 COMMENT ON FUNCTION migration_staging.convert_boolean(TEXT) IS 'Converts SQL Server bit/char values to PostgreSQL booleans';
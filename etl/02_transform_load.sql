@@ -14,6 +14,7 @@ CREATE OR REPLACE FUNCTION migration_staging.transform_load_districts(
 ) RETURNS INTEGER AS $$
 DECLARE
     v_log_id BIGINT;
+    v_start_time TIMESTAMP WITH TIME ZONE := clock_timestamp();
     v_processed INTEGER := 0;
     v_success INTEGER := 0;
     v_errors INTEGER := 0;
@@ -24,34 +25,68 @@ BEGIN
         p_batch_id, 'districts', 'TRANSFORM_LOAD', 'STARTED', 'Starting district transformation'
     );
     
-    -- Transform and load districts
-    FOR v_district IN 
-        SELECT DISTINCT bez_ID, bez_Name 
+    -- Transform and load districts as one set-based statement; fall back to
+    -- row-by-row processing if any row makes it fail
+    BEGIN
+        INSERT INTO districts (uuid, name, description, is_active)
+        SELECT DISTINCT ON (TRIM(bez_Name))
+            migration_staging.convert_guid(bez_ID),
+            TRIM(bez_Name),
+            'Migrated from legacy system',
+            true
         FROM migration_staging.raw_bezirk 
         WHERE migration_batch_id = p_batch_id 
           AND bez_Name IS NOT NULL
-    LOOP
-        BEGIN
-            v_processed := v_processed + 1;
+        ORDER BY TRIM(bez_Name), bez_ID
+        ON CONFLICT (name) DO UPDATE SET
+            description = COALESCE(districts.description, 'Migrated from legacy system'),
+            updated_at = NOW()
+        WHERE districts.description IS NULL;
+        
+        -- Count every source row the row-by-row path would visit as processed and,
+        -- since the statement succeeded, successful; that includes rows merged by
+        -- DISTINCT ON and rows the ON CONFLICT clause left unchanged
+        SELECT COUNT(*) INTO v_processed
+        FROM (
+            SELECT DISTINCT bez_ID, bez_Name 
+            FROM migration_staging.raw_bezirk 
+            WHERE migration_batch_id = p_batch_id 
+              AND bez_Name IS NOT NULL
+        ) source_rows;
+        v_success := v_processed;
+        
+    EXCEPTION WHEN OTHERS THEN
+        RAISE NOTICE 'Bulk district load failed (%), retrying row by row', SQLERRM;
+        
+        FOR v_district IN 
+            SELECT DISTINCT bez_ID, bez_Name 
+            FROM migration_staging.raw_bezirk 
+            WHERE migration_batch_id = p_batch_id 
+              AND bez_Name IS NOT NULL
+        LOOP
+            BEGIN
+                v_processed := v_processed + 1;
             
-            INSERT INTO districts (uuid, name, description, is_active)
-            VALUES (
-                migration_staging.convert_guid(v_district.bez_ID),
-                TRIM(v_district.bez_Name),
-                'Migrated from legacy system',
-                true
-            )
-            ON CONFLICT (name) DO UPDATE SET
-                description = COALESCE(districts.description, 'Migrated from legacy system'),
-                updated_at = NOW();
+                INSERT INTO districts (uuid, name, description, is_active)
+                VALUES (
+                    migration_staging.convert_guid(v_district.bez_ID),
+                    TRIM(v_district.bez_Name),
+                    'Migrated from legacy system',
+                    true
+                )
+                ON CONFLICT (name) DO UPDATE SET
+                    description = COALESCE(districts.description, 'Migrated from legacy system'),
+                    updated_at = NOW()
+                WHERE districts.description IS NULL;
                 
-            v_success := v_success + 1;
+                v_success := v_success + 1;
             
-        EXCEPTION WHEN OTHERS THEN
-            v_errors := v_errors + 1;
-            RAISE WARNING 'Error processing district %: %', v_district.bez_Name, SQLERRM;
-        END;
-    END LOOP;
+            EXCEPTION WHEN OTHERS THEN
+                v_errors := v_errors + 1;
+                RAISE WARNING 'Error processing district %: %', v_district.bez_Name, SQLERRM;
+            END;
+        END LOOP;
+    END;
     
     -- Update log
     UPDATE migration_staging.migration_log 
@@ -60,8 +95,8 @@ BEGIN
         records_processed = v_processed,
         records_success = v_success, 
         records_error = v_errors,
-        completed_at = NOW(),
-        duration_seconds = EXTRACT(EPOCH FROM (NOW() - started_at))
+        completed_at = clock_timestamp(),
+        duration_seconds = EXTRACT(EPOCH FROM (clock_timestamp() - v_start_time))
     WHERE id = v_log_id;
     
     RETURN v_success;
@@ -74,55 +109,51 @@ CREATE OR REPLACE FUNCTION migration_staging.transform_load_cadastral_districts(
 ) RETURNS INTEGER AS $$
 DECLARE
     v_log_id BIGINT;
+    v_start_time TIMESTAMP WITH TIME ZONE := clock_timestamp();
     v_processed INTEGER := 0;
     v_success INTEGER := 0;
     v_errors INTEGER := 0;
     v_cadastral RECORD;
-    v_district_id BIGINT;
 BEGIN
     -- Log start
     v_log_id := migration_staging.log_migration_step(
         p_batch_id, 'cadastral_districts', 'TRANSFORM_LOAD', 'STARTED', 'Starting cadastral district transformation'
     );
     
-    -- Transform and load cadastral districts
+    -- Transform and load cadastral districts, resolving the district by UUID
+    -- or, failing that, by name from the junction table
     FOR v_cadastral IN 
-        SELECT DISTINCT kat_ID, kat_bez_ID, kat_Katasterbezirk, kat_KatasterbezirkName
-        FROM migration_staging.raw_katasterbezirk 
-        WHERE migration_batch_id = p_batch_id 
-          AND kat_Katasterbezirk IS NOT NULL
+        SELECT DISTINCT k.kat_ID, k.kat_bez_ID, k.kat_Katasterbezirk, k.kat_KatasterbezirkName,
+               COALESCE(d.id, bk.district_id) AS district_id
+        FROM migration_staging.raw_katasterbezirk k
+        LEFT JOIN districts d 
+            ON d.uuid = migration_staging.convert_guid(k.kat_bez_ID)
+        LEFT JOIN (
+            SELECT DISTINCT ON (j.kat_Katasterbezirk) j.kat_Katasterbezirk, jd.id AS district_id
+            FROM migration_staging.raw_bezirke_katasterbezirke j
+            JOIN districts jd ON jd.name = j.bez_Name
+            WHERE j.migration_batch_id = p_batch_id
+            ORDER BY j.kat_Katasterbezirk
+        ) bk ON bk.kat_Katasterbezirk = k.kat_Katasterbezirk
+        WHERE k.migration_batch_id = p_batch_id 
+          AND k.kat_Katasterbezirk IS NOT NULL
     LOOP
         BEGIN
             v_processed := v_processed + 1;
             
-            -- Find corresponding district
-            SELECT id INTO v_district_id
-            FROM districts 
-            WHERE uuid = migration_staging.convert_guid(v_cadastral.kat_bez_ID);
-            
-            IF v_district_id IS NULL THEN
-                -- Try to find by name from junction table
-                SELECT d.id INTO v_district_id
-                FROM districts d
-                JOIN migration_staging.raw_bezirke_katasterbezirke bk 
-                    ON d.name = bk.bez_Name
-                WHERE bk.kat_Katasterbezirk = v_cadastral.kat_Katasterbezirk
-                  AND bk.migration_batch_id = p_batch_id
-                LIMIT 1;
-            END IF;
-            
-            IF v_district_id IS NOT NULL THEN
+            IF v_cadastral.district_id IS NOT NULL THEN
                 INSERT INTO cadastral_districts (uuid, district_id, code, name, is_active)
                 VALUES (
                     migration_staging.convert_guid(v_cadastral.kat_ID),
-                    v_district_id,
+                    v_cadastral.district_id,
                     TRIM(v_cadastral.kat_Katasterbezirk),
                     TRIM(v_cadastral.kat_KatasterbezirkName),
                     true
                 )
                 ON CONFLICT (district_id, code) DO UPDATE SET
                     name = TRIM(v_cadastral.kat_KatasterbezirkName),
-                    updated_at = NOW();
+                    updated_at = NOW()
+                WHERE cadastral_districts.name IS DISTINCT FROM EXCLUDED.name;
                     
                 v_success := v_success + 1;
             ELSE
@@ -143,8 +174,8 @@ BEGIN
         records_processed = v_processed,
         records_success = v_success, 
         records_error = v_errors,
-        completed_at = NOW(),
-        duration_seconds = EXTRACT(EPOCH FROM (NOW() - started_at))
+        completed_at = clock_timestamp(),
+        duration_seconds = EXTRACT(EPOCH FROM (clock_timestamp() - v_start_time))
     WHERE id = v_log_id;
     
     RETURN v_success;
@@ -157,6 +188,7 @@ CREATE OR REPLACE FUNCTION migration_staging.transform_load_users(
 ) RETURNS INTEGER AS $$
 DECLARE
     v_log_id BIGINT;
+    v_start_time TIMESTAMP WITH TIME ZONE := clock_timestamp();
     v_processed INTEGER := 0;
     v_success INTEGER := 0;
     v_errors INTEGER := 0;
@@ -167,69 +199,174 @@ BEGIN
         p_batch_id, 'users', 'TRANSFORM_LOAD', 'STARTED', 'Starting users transformation'
     );
     
-    -- Transform and load users
-    FOR v_user IN 
-        SELECT * FROM migration_staging.raw_personen 
+    -- Transform and load users as one set-based statement; fall back to
+    -- row-by-row processing if any row makes it fail. Users without an
+    -- employee number never conflict, so they are deduplicated by ID.
+    BEGIN
+        INSERT INTO users (
+            uuid, salutation, first_name, last_name, employee_number,
+            department, room, phone, fax, email, signature_code, signature_text, job_title,
+            is_admin, can_administrate, can_manage_service_groups, 
+            can_manage_priorities_sla, can_manage_customers, is_active
+        )
+        SELECT DISTINCT ON (COALESCE(TRIM(Pers_Nummer), Pers_ID))
+            migration_staging.convert_guid(Pers_ID),
+            TRIM(Pers_Anrede),
+            TRIM(Pers_Vorname),
+            TRIM(Pers_Nachname),
+            TRIM(Pers_Nummer),
+            TRIM(Pers_Organisationseinheit),
+            TRIM(Pers_Zimmer),
+            migration_staging.validate_phone(Pers_Telefon),
+            migration_staging.validate_phone(Pers_FAX),
+            migration_staging.validate_email(Pers_Email),
+            TRIM(Pers_Diktatzeichen),
+            TRIM(Pers_Unterschrift),
+            TRIM(Pers_Dienstbezeichnung),
+            migration_staging.convert_boolean(Pers_istAdmin),
+            migration_staging.convert_boolean(Pers_darfAdministration),
+            migration_staging.convert_boolean(Pers_darfLeistungsgruppen),
+            migration_staging.convert_boolean(Pers_darfPrioUndSLA),
+            migration_staging.convert_boolean(Pers_darfKunden),
+            COALESCE(migration_staging.convert_boolean(Pers_Aktiv), true)
+        FROM migration_staging.raw_personen 
         WHERE migration_batch_id = p_batch_id 
           AND Pers_Vorname IS NOT NULL 
           AND Pers_Nachname IS NOT NULL
-    LOOP
-        BEGIN
-            v_processed := v_processed + 1;
+        ORDER BY COALESCE(TRIM(Pers_Nummer), Pers_ID), Pers_ID
+        ON CONFLICT (employee_number) DO UPDATE SET
+            salutation = EXCLUDED.salutation,
+            first_name = EXCLUDED.first_name,
+            last_name = EXCLUDED.last_name,
+            department = EXCLUDED.department,
+            room = EXCLUDED.room,
+            phone = EXCLUDED.phone,
+            fax = EXCLUDED.fax,
+            email = EXCLUDED.email,
+            signature_code = EXCLUDED.signature_code,
+            signature_text = EXCLUDED.signature_text,
+            job_title = EXCLUDED.job_title,
+            is_admin = EXCLUDED.is_admin,
+            can_administrate = EXCLUDED.can_administrate,
+            can_manage_service_groups = EXCLUDED.can_manage_service_groups,
+            can_manage_priorities_sla = EXCLUDED.can_manage_priorities_sla,
+            can_manage_customers = EXCLUDED.can_manage_customers,
+            is_active = EXCLUDED.is_active,
+            updated_at = NOW()
+        WHERE (
+            users.salutation, users.first_name, users.last_name, users.department, users.room,
+            users.phone, users.fax, users.email, users.signature_code, users.signature_text,
+            users.job_title, users.is_admin, users.can_administrate,
+            users.can_manage_service_groups, users.can_manage_priorities_sla,
+            users.can_manage_customers, users.is_active
+        ) IS DISTINCT FROM (
+            EXCLUDED.salutation, EXCLUDED.first_name, EXCLUDED.last_name, EXCLUDED.department,
+            EXCLUDED.room, EXCLUDED.phone, EXCLUDED.fax, EXCLUDED.email,
+            EXCLUDED.signature_code, EXCLUDED.signature_text, EXCLUDED.job_title,
+            EXCLUDED.is_admin, EXCLUDED.can_administrate, EXCLUDED.can_manage_service_groups,
+            EXCLUDED.can_manage_priorities_sla, EXCLUDED.can_manage_customers,
+            EXCLUDED.is_active
+        );
+        
+        -- Every source row counts as processed. Each DISTINCT ON group was
+        -- inserted, updated or left unchanged by the ON CONFLICT guard and
+        -- counts as successful; the duplicates it collapsed were not loaded
+        SELECT COALESCE(SUM(group_rows), 0), COUNT(*) INTO v_processed, v_success
+        FROM (
+            SELECT COUNT(*) AS group_rows
+            FROM migration_staging.raw_personen 
+            WHERE migration_batch_id = p_batch_id 
+              AND Pers_Vorname IS NOT NULL 
+              AND Pers_Nachname IS NOT NULL
+            GROUP BY COALESCE(TRIM(Pers_Nummer), Pers_ID)
+        ) user_groups;
+        v_errors := v_processed - v_success;
+        
+        IF v_errors > 0 THEN
+            RAISE WARNING 'Skipped % duplicate users (same employee number, or same ID without one)', v_errors;
+        END IF;
+        
+    EXCEPTION WHEN OTHERS THEN
+        RAISE NOTICE 'Bulk user load failed (%), retrying row by row', SQLERRM;
+        
+        FOR v_user IN 
+            SELECT * FROM migration_staging.raw_personen 
+            WHERE migration_batch_id = p_batch_id 
+              AND Pers_Vorname IS NOT NULL 
+              AND Pers_Nachname IS NOT NULL
+        LOOP
+            BEGIN
+                v_processed := v_processed + 1;
             
-            INSERT INTO users (
-                uuid, salutation, first_name, last_name, employee_number,
-                department, room, phone, fax, email, signature_code, signature_text, job_title,
-                is_admin, can_administrate, can_manage_service_groups, 
-                can_manage_priorities_sla, can_manage_customers, is_active
-            ) VALUES (
-                migration_staging.convert_guid(v_user.Pers_ID),
-                TRIM(v_user.Pers_Anrede),
-                TRIM(v_user.Pers_Vorname),
-                TRIM(v_user.Pers_Nachname),
-                TRIM(v_user.Pers_Nummer),
-                TRIM(v_user.Pers_Organisationseinheit),
-                TRIM(v_user.Pers_Zimmer),
-                migration_staging.validate_phone(v_user.Pers_Telefon),
-                migration_staging.validate_phone(v_user.Pers_FAX),
-                migration_staging.validate_email(v_user.Pers_Email),
-                TRIM(v_user.Pers_Diktatzeichen),
-                TRIM(v_user.Pers_Unterschrift),
-                TRIM(v_user.Pers_Dienstbezeichnung),
-                migration_staging.convert_boolean(v_user.Pers_istAdmin),
-                migration_staging.convert_boolean(v_user.Pers_darfAdministration),
-                migration_staging.convert_boolean(v_user.Pers_darfLeistungsgruppen),
-                migration_staging.convert_boolean(v_user.Pers_darfPrioUndSLA),
-                migration_staging.convert_boolean(v_user.Pers_darfKunden),
-                COALESCE(migration_staging.convert_boolean(v_user.Pers_Aktiv), true)
-            )
-            ON CONFLICT (employee_number) DO UPDATE SET
-                salutation = EXCLUDED.salutation,
-                first_name = EXCLUDED.first_name,
-                last_name = EXCLUDED.last_name,
-                department = EXCLUDED.department,
-                room = EXCLUDED.room,
-                phone = EXCLUDED.phone,
-                fax = EXCLUDED.fax,
-                email = EXCLUDED.email,
-                signature_code = EXCLUDED.signature_code,
-                signature_text = EXCLUDED.signature_text,
-                job_title = EXCLUDED.job_title,
-                is_admin = EXCLUDED.is_admin,
-                can_administrate = EXCLUDED.can_administrate,
-                can_manage_service_groups = EXCLUDED.can_manage_service_groups,
-                can_manage_priorities_sla = EXCLUDED.can_manage_priorities_sla,
-                can_manage_customers = EXCLUDED.can_manage_customers,
-                is_active = EXCLUDED.is_active,
-                updated_at = NOW();
+                INSERT INTO users (
+                    uuid, salutation, first_name, last_name, employee_number,
+                    department, room, phone, fax, email, signature_code, signature_text, job_title,
+                    is_admin, can_administrate, can_manage_service_groups, 
+                    can_manage_priorities_sla, can_manage_customers, is_active
+                ) VALUES (
+                    migration_staging.convert_guid(v_user.Pers_ID),
+                    TRIM(v_user.Pers_Anrede),
+                    TRIM(v_user.Pers_Vorname),
+                    TRIM(v_user.Pers_Nachname),
+                    TRIM(v_user.Pers_Nummer),
+                    TRIM(v_user.Pers_Organisationseinheit),
+                    TRIM(v_user.Pers_Zimmer),
+                    migration_staging.validate_phone(v_user.Pers_Telefon),
+                    migration_staging.validate_phone(v_user.Pers_FAX),
+                    migration_staging.validate_email(v_user.Pers_Email),
+                    TRIM(v_user.Pers_Diktatzeichen),
+                    TRIM(v_user.Pers_Unterschrift),
+                    TRIM(v_user.Pers_Dienstbezeichnung),
+                    migration_staging.convert_boolean(v_user.Pers_istAdmin),
+                    migration_staging.convert_boolean(v_user.Pers_darfAdministration),
+                    migration_staging.convert_boolean(v_user.Pers_darfLeistungsgruppen),
+                    migration_staging.convert_boolean(v_user.Pers_darfPrioUndSLA),
+                    migration_staging.convert_boolean(v_user.Pers_darfKunden),
+                    COALESCE(migration_staging.convert_boolean(v_user.Pers_Aktiv), true)
+                )
+                ON CONFLICT (employee_number) DO UPDATE SET
+                    salutation = EXCLUDED.salutation,
+                    first_name = EXCLUDED.first_name,
+                    last_name = EXCLUDED.last_name,
+                    department = EXCLUDED.department,
+                    room = EXCLUDED.room,
+                    phone = EXCLUDED.phone,
+                    fax = EXCLUDED.fax,
+                    email = EXCLUDED.email,
+                    signature_code = EXCLUDED.signature_code,
+                    signature_text = EXCLUDED.signature_text,
+                    job_title = EXCLUDED.job_title,
+                    is_admin = EXCLUDED.is_admin,
+                    can_administrate = EXCLUDED.can_administrate,
+                    can_manage_service_groups = EXCLUDED.can_manage_service_groups,
+                    can_manage_priorities_sla = EXCLUDED.can_manage_priorities_sla,
+                    can_manage_customers = EXCLUDED.can_manage_customers,
+                    is_active = EXCLUDED.is_active,
+                    updated_at = NOW()
+                WHERE (
+                    users.salutation, users.first_name, users.last_name, users.department,
+                    users.room, users.phone, users.fax, users.email, users.signature_code,
+                    users.signature_text, users.job_title, users.is_admin,
+                    users.can_administrate, users.can_manage_service_groups,
+                    users.can_manage_priorities_sla, users.can_manage_customers,
+                    users.is_active
+                ) IS DISTINCT FROM (
+                    EXCLUDED.salutation, EXCLUDED.first_name, EXCLUDED.last_name,
+                    EXCLUDED.department, EXCLUDED.room, EXCLUDED.phone, EXCLUDED.fax,
+                    EXCLUDED.email, EXCLUDED.signature_code, EXCLUDED.signature_text,
+                    EXCLUDED.job_title, EXCLUDED.is_admin, EXCLUDED.can_administrate,
+                    EXCLUDED.can_manage_service_groups, EXCLUDED.can_manage_priorities_sla,
+                    EXCLUDED.can_manage_customers, EXCLUDED.is_active
+                );
                 
-            v_success := v_success + 1;
+                v_success := v_success + 1;
             
-        EXCEPTION WHEN OTHERS THEN
-            v_errors := v_errors + 1;
-            RAISE WARNING 'Error processing user % %: %', v_user.Pers_Vorname, v_user.Pers_Nachname, SQLERRM;
-        END;
-    END LOOP;
+            EXCEPTION WHEN OTHERS THEN
+                v_errors := v_errors + 1;
+                RAISE WARNING 'Error processing user % %: %', v_user.Pers_Vorname, v_user.Pers_Nachname, SQLERRM;
+            END;
+        END LOOP;
+    END;
     
     -- Update log
     UPDATE migration_staging.migration_log 
@@ -238,8 +375,8 @@ BEGIN
         records_processed = v_processed,
         records_success = v_success, 
         records_error = v_errors,
-        completed_at = NOW(),
-        duration_seconds = EXTRACT(EPOCH FROM (NOW() - started_at))
+        completed_at = clock_timestamp(),
+        duration_seconds = EXTRACT(EPOCH FROM (clock_timestamp() - v_start_time))
     WHERE id = v_log_id;
     
     RETURN v_success;
@@ -252,6 +389,7 @@ CREATE OR REPLACE FUNCTION migration_staging.transform_load_file_references(
 ) RETURNS INTEGER AS $$
 DECLARE
     v_log_id BIGINT;
+    v_start_time TIMESTAMP WITH TIME ZONE := clock_timestamp();
     v_processed INTEGER := 0;
     v_success INTEGER := 0;
     v_errors INTEGER := 0;
@@ -262,36 +400,67 @@ BEGIN
         p_batch_id, 'file_references', 'TRANSFORM_LOAD', 'STARTED', 'Starting file references transformation'
     );
     
-    -- Transform and load file references
-    FOR v_file_ref IN 
-        SELECT * FROM migration_staging.raw_aktenzeichen 
+    -- Transform and load file references as one set-based statement; fall back to
+    -- row-by-row processing if any row makes it fail
+    BEGIN
+        INSERT INTO file_references (uuid, district_code, number, year, is_active)
+        SELECT DISTINCT ON (TRIM(az_Bezirk), az_Nummer, az_Jahr)
+            migration_staging.convert_guid(az_ID),
+            TRIM(az_Bezirk),
+            az_Nummer,
+            az_Jahr,
+            true
+        FROM migration_staging.raw_aktenzeichen 
         WHERE migration_batch_id = p_batch_id 
           AND az_Bezirk IS NOT NULL 
           AND az_Nummer IS NOT NULL 
           AND az_Jahr IS NOT NULL
-    LOOP
-        BEGIN
-            v_processed := v_processed + 1;
+        ORDER BY TRIM(az_Bezirk), az_Nummer, az_Jahr, az_ID
+        ON CONFLICT (district_code, number, year) DO NOTHING;
+        
+        -- Count every source row the row-by-row path would visit as processed and,
+        -- since the statement succeeded, successful; that includes rows merged by
+        -- DISTINCT ON and rows the ON CONFLICT clause left unchanged
+        SELECT COUNT(*) INTO v_processed
+        FROM migration_staging.raw_aktenzeichen 
+        WHERE migration_batch_id = p_batch_id 
+          AND az_Bezirk IS NOT NULL 
+          AND az_Nummer IS NOT NULL 
+          AND az_Jahr IS NOT NULL;
+        v_success := v_processed;
+        
+    EXCEPTION WHEN OTHERS THEN
+        RAISE NOTICE 'Bulk file reference load failed (%), retrying row by row', SQLERRM;
+        
+        FOR v_file_ref IN 
+            SELECT * FROM migration_staging.raw_aktenzeichen 
+            WHERE migration_batch_id = p_batch_id 
+              AND az_Bezirk IS NOT NULL 
+              AND az_Nummer IS NOT NULL 
+              AND az_Jahr IS NOT NULL
+        LOOP
+            BEGIN
+                v_processed := v_processed + 1;
             
-            INSERT INTO file_references (uuid, district_code, number, year, is_active)
-            VALUES (
-                migration_staging.convert_guid(v_file_ref.az_ID),
-                TRIM(v_file_ref.az_Bezirk),
-                v_file_ref.az_Nummer,
-                v_file_ref.az_Jahr,
-                true
-            )
-            ON CONFLICT (district_code, number, year) DO UPDATE SET
-                updated_at = NOW();
+                INSERT INTO file_references (uuid, district_code, number, year, is_active)
+                VALUES (
+                    migration_staging.convert_guid(v_file_ref.az_ID),
+                    TRIM(v_file_ref.az_Bezirk),
+                    v_file_ref.az_Nummer,
+                    v_file_ref.az_Jahr,
+                    true
+                )
+                ON CONFLICT (district_code, number, year) DO NOTHING;
                 
-            v_success := v_success + 1;
+                v_success := v_success + 1;
             
-        EXCEPTION WHEN OTHERS THEN
-            v_errors := v_errors + 1;
-            RAISE WARNING 'Error processing file reference %-%-%: %', 
-                v_file_ref.az_Bezirk, v_file_ref.az_Nummer, v_file_ref.az_Jahr, SQLERRM;
-        END;
-    END LOOP;
+            EXCEPTION WHEN OTHERS THEN
+                v_errors := v_errors + 1;
+                RAISE WARNING 'Error processing file reference %-%-%: %', 
+                    v_file_ref.az_Bezirk, v_file_ref.az_Nummer, v_file_ref.az_Jahr, SQLERRM;
+            END;
+        END LOOP;
+    END;
     
     -- Update log
     UPDATE migration_staging.migration_log 
@@ -300,8 +469,8 @@ BEGIN
         records_processed = v_processed,
         records_success = v_success, 
         records_error = v_errors,
-        completed_at = NOW(),
-        duration_seconds = EXTRACT(EPOCH FROM (NOW() - started_at))
+        completed_at = clock_timestamp(),
+        duration_seconds = EXTRACT(EPOCH FROM (clock_timestamp() - v_start_time))
     WHERE id = v_log_id;
     
     RETURN v_success;
@@ -314,6 +483,7 @@ CREATE OR REPLACE FUNCTION migration_staging.transform_load_entry_numbers(
 ) RETURNS INTEGER AS $$
 DECLARE
     v_log_id BIGINT;
+    v_start_time TIMESTAMP WITH TIME ZONE := clock_timestamp();
     v_processed INTEGER := 0;
     v_success INTEGER := 0;
     v_errors INTEGER := 0;
@@ -324,36 +494,67 @@ BEGIN
         p_batch_id, 'entry_numbers', 'TRANSFORM_LOAD', 'STARTED', 'Starting entry numbers transformation'
     );
     
-    -- Transform and load entry numbers
-    FOR v_entry_num IN 
-        SELECT * FROM migration_staging.raw_eingangsnummer 
+    -- Transform and load entry numbers as one set-based statement; fall back to
+    -- row-by-row processing if any row makes it fail
+    BEGIN
+        INSERT INTO entry_numbers (uuid, district_code, number, year, is_active)
+        SELECT DISTINCT ON (TRIM(enr_Bezirk), enr_Nummer, enr_Jahr)
+            migration_staging.convert_guid(enr_ID),
+            TRIM(enr_Bezirk),
+            enr_Nummer,
+            enr_Jahr,
+            true
+        FROM migration_staging.raw_eingangsnummer 
         WHERE migration_batch_id = p_batch_id 
           AND enr_Bezirk IS NOT NULL 
           AND enr_Nummer IS NOT NULL 
           AND enr_Jahr IS NOT NULL
-    LOOP
-        BEGIN
-            v_processed := v_processed + 1;
+        ORDER BY TRIM(enr_Bezirk), enr_Nummer, enr_Jahr, enr_ID
+        ON CONFLICT (district_code, number, year) DO NOTHING;
+        
+        -- Count every source row the row-by-row path would visit as processed and,
+        -- since the statement succeeded, successful; that includes rows merged by
+        -- DISTINCT ON and rows the ON CONFLICT clause left unchanged
+        SELECT COUNT(*) INTO v_processed
+        FROM migration_staging.raw_eingangsnummer 
+        WHERE migration_batch_id = p_batch_id 
+          AND enr_Bezirk IS NOT NULL 
+          AND enr_Nummer IS NOT NULL 
+          AND enr_Jahr IS NOT NULL;
+        v_success := v_processed;
+        
+    EXCEPTION WHEN OTHERS THEN
+        RAISE NOTICE 'Bulk entry number load failed (%), retrying row by row', SQLERRM;
+        
+        FOR v_entry_num IN 
+            SELECT * FROM migration_staging.raw_eingangsnummer 
+            WHERE migration_batch_id = p_batch_id 
+              AND enr_Bezirk IS NOT NULL 
+              AND enr_Nummer IS NOT NULL 
+              AND enr_Jahr IS NOT NULL
+        LOOP
+            BEGIN
+                v_processed := v_processed + 1;
             
-            INSERT INTO entry_numbers (uuid, district_code, number, year, is_active)
-            VALUES (
-                migration_staging.convert_guid(v_entry_num.enr_ID),
-                TRIM(v_entry_num.enr_Bezirk),
-                v_entry_num.enr_Nummer,
-                v_entry_num.enr_Jahr,
-                true
-            )
-            ON CONFLICT (district_code, number, year) DO UPDATE SET
-                updated_at = NOW();
+                INSERT INTO entry_numbers (uuid, district_code, number, year, is_active)
+                VALUES (
+                    migration_staging.convert_guid(v_entry_num.enr_ID),
+                    TRIM(v_entry_num.enr_Bezirk),
+                    v_entry_num.enr_Nummer,
+                    v_entry_num.enr_Jahr,
+                    true
+                )
+                ON CONFLICT (district_code, number, year) DO NOTHING;
                 
-            v_success := v_success + 1;
+                v_success := v_success + 1;
             
-        EXCEPTION WHEN OTHERS THEN
-            v_errors := v_errors + 1;
-            RAISE WARNING 'Error processing entry number %-%-%: %', 
-                v_entry_num.enr_Bezirk, v_entry_num.enr_Nummer, v_entry_num.enr_Jahr, SQLERRM;
-        END;
-    END LOOP;
+            EXCEPTION WHEN OTHERS THEN
+                v_errors := v_errors + 1;
+                RAISE WARNING 'Error processing entry number %-%-%: %', 
+                    v_entry_num.enr_Bezirk, v_entry_num.enr_Nummer, v_entry_num.enr_Jahr, SQLERRM;
+            END;
+        END LOOP;
+    END;
     
     -- Update log
     UPDATE migration_staging.migration_log 
@@ -362,8 +563,8 @@ BEGIN
         records_processed = v_processed,
         records_success = v_success, 
         records_error = v_errors,
-        completed_at = NOW(),
-        duration_seconds = EXTRACT(EPOCH FROM (NOW() - started_at))
+        completed_at = clock_timestamp(),
+        duration_seconds = EXTRACT(EPOCH FROM (clock_timestamp() - v_start_time))
     WHERE id = v_log_id;
     
     RETURN v_success;
@@ -376,6 +577,7 @@ CREATE OR REPLACE FUNCTION migration_staging.transform_load_applications(
 ) RETURNS INTEGER AS $$
 DECLARE
     v_log_id BIGINT;
+    v_start_time TIMESTAMP WITH TIME ZONE := clock_timestamp();
     v_processed INTEGER := 0;
     v_success INTEGER := 0;
     v_errors INTEGER := 0;
@@ -386,64 +588,125 @@ BEGIN
         p_batch_id, 'applications', 'TRANSFORM_LOAD', 'STARTED', 'Starting applications transformation'
     );
     
-    -- Transform and load applications
-    FOR v_app IN 
-        SELECT * FROM migration_staging.raw_antrag 
+    -- Transform and load applications as one set-based statement. A single bad
+    -- row aborts it, in which case fall back to row-by-row processing so the
+    -- failing rows are reported and the rest still load.
+    BEGIN
+        INSERT INTO applications (
+            uuid, file_reference, waiting_list_number_32, waiting_list_number_33,
+            salutation, title, first_name, last_name, birth_date,
+            salutation_2, title_2, first_name_2, last_name_2, birth_date_2,
+            letter_salutation, street, postal_code, city,
+            phone, mobile_phone, mobile_phone_2, business_phone, email,
+            application_date, confirmation_date, current_offer_date, deletion_date, deactivated_at,
+            preferences, remarks, is_active
+        )
+        SELECT
+            migration_staging.convert_guid(an_ID),
+            TRIM(an_Aktenzeichen),
+            TRIM(an_WartelistenNr32),
+            TRIM(an_WartelistenNr33),
+            TRIM(an_Anrede),
+            TRIM(an_Titel),
+            TRIM(an_Vorname),
+            TRIM(an_Nachname),
+            migration_staging.convert_birth_date(an_Geburtstag),
+            TRIM(an_Anrede2),
+            TRIM(an_Titel2),
+            TRIM(an_Vorname2),
+            TRIM(an_Nachname2),
+            migration_staging.convert_birth_date(an_Geburtstag2),
+            TRIM(an_Briefanrede),
+            TRIM(an_Strasse),
+            migration_staging.validate_postal_code(an_PLZ),
+            TRIM(an_Ort),
+            migration_staging.validate_phone(an_Telefon),
+            migration_staging.validate_phone(an_MobilTelefon),
+            migration_staging.validate_phone(an_MobilTelefon2),
+            migration_staging.validate_phone(an_GeschTelefon),
+            migration_staging.validate_email(an_EMail),
+            migration_staging.convert_datetime(an_Bewerbungsdatum)::DATE,
+            migration_staging.convert_datetime(an_Bestaetigungsdatum)::DATE,
+            migration_staging.convert_datetime(an_AktuellesAngebot)::DATE,
+            migration_staging.convert_datetime(an_Loeschdatum)::DATE,
+            migration_staging.convert_datetime(an_DeaktiviertAm),
+            TRIM(an_Wunsch),
+            TRIM(an_Vermerk),
+            COALESCE(migration_staging.convert_boolean(an_Aktiv), true)
+        FROM migration_staging.raw_antrag 
         WHERE migration_batch_id = p_batch_id
-    LOOP
-        BEGIN
-            v_processed := v_processed + 1;
+        ON CONFLICT (uuid) DO NOTHING;
+        
+        -- Count every source row the row-by-row path would visit as processed and,
+        -- since the statement succeeded, successful; that includes rows already
+        -- loaded by an earlier run of the batch
+        SELECT COUNT(*) INTO v_processed
+        FROM migration_staging.raw_antrag 
+        WHERE migration_batch_id = p_batch_id;
+        v_success := v_processed;
+        
+    EXCEPTION WHEN OTHERS THEN
+        RAISE NOTICE 'Bulk application load failed (%), retrying row by row', SQLERRM;
+        
+        FOR v_app IN 
+            SELECT * FROM migration_staging.raw_antrag 
+            WHERE migration_batch_id = p_batch_id
+        LOOP
+            BEGIN
+                v_processed := v_processed + 1;
             
-            INSERT INTO applications (
-                uuid, file_reference, waiting_list_number_32, waiting_list_number_33,
-                salutation, title, first_name, last_name, birth_date,
-                salutation_2, title_2, first_name_2, last_name_2, birth_date_2,
-                letter_salutation, street, postal_code, city,
-                phone, mobile_phone, mobile_phone_2, business_phone, email,
-                application_date, confirmation_date, current_offer_date, deletion_date, deactivated_at,
-                preferences, remarks, is_active
-            ) VALUES (
-                migration_staging.convert_guid(v_app.an_ID),
-                TRIM(v_app.an_Aktenzeichen),
-                TRIM(v_app.an_WartelistenNr32),
-                TRIM(v_app.an_WartelistenNr33),
-                TRIM(v_app.an_Anrede),
-                TRIM(v_app.an_Titel),
-                TRIM(v_app.an_Vorname),
-                TRIM(v_app.an_Nachname),
-                migration_staging.convert_birth_date(v_app.an_Geburtstag),
-                TRIM(v_app.an_Anrede2),
-                TRIM(v_app.an_Titel2),
-                TRIM(v_app.an_Vorname2),
-                TRIM(v_app.an_Nachname2),
-                migration_staging.convert_birth_date(v_app.an_Geburtstag2),
-                TRIM(v_app.an_Briefanrede),
-                TRIM(v_app.an_Strasse),
-                migration_staging.validate_postal_code(v_app.an_PLZ),
-                TRIM(v_app.an_Ort),
-                migration_staging.validate_phone(v_app.an_Telefon),
-                migration_staging.validate_phone(v_app.an_MobilTelefon),
-                migration_staging.validate_phone(v_app.an_MobilTelefon2),
-                migration_staging.validate_phone(v_app.an_GeschTelefon),
-                migration_staging.validate_email(v_app.an_EMail),
-                migration_staging.convert_datetime(v_app.an_Bewerbungsdatum)::DATE,
-                migration_staging.convert_datetime(v_app.an_Bestaetigungsdatum)::DATE,
-                migration_staging.convert_datetime(v_app.an_AktuellesAngebot)::DATE,
-                migration_staging.convert_datetime(v_app.an_Loeschdatum)::DATE,
-                migration_staging.convert_datetime(v_app.an_DeaktiviertAm),
-                TRIM(v_app.an_Wunsch),
-                TRIM(v_app.an_Vermerk),
-                COALESCE(migration_staging.convert_boolean(v_app.an_Aktiv), true)
-            );
+                INSERT INTO applications (
+                    uuid, file_reference, waiting_list_number_32, waiting_list_number_33,
+                    salutation, title, first_name, last_name, birth_date,
+                    salutation_2, title_2, first_name_2, last_name_2, birth_date_2,
+                    letter_salutation, street, postal_code, city,
+                    phone, mobile_phone, mobile_phone_2, business_phone, email,
+                    application_date, confirmation_date, current_offer_date, deletion_date, deactivated_at,
+                    preferences, remarks, is_active
+                ) VALUES (
+                    migration_staging.convert_guid(v_app.an_ID),
+                    TRIM(v_app.an_Aktenzeichen),
+                    TRIM(v_app.an_WartelistenNr32),
+                    TRIM(v_app.an_WartelistenNr33),
+                    TRIM(v_app.an_Anrede),
+                    TRIM(v_app.an_Titel),
+                    TRIM(v_app.an_Vorname),
+                    TRIM(v_app.an_Nachname),
+                    migration_staging.convert_birth_date(v_app.an_Geburtstag),
+                    TRIM(v_app.an_Anrede2),
+                    TRIM(v_app.an_Titel2),
+                    TRIM(v_app.an_Vorname2),
+                    TRIM(v_app.an_Nachname2),
+                    migration_staging.convert_birth_date(v_app.an_Geburtstag2),
+                    TRIM(v_app.an_Briefanrede),
+                    TRIM(v_app.an_Strasse),
+                    migration_staging.validate_postal_code(v_app.an_PLZ),
+                    TRIM(v_app.an_Ort),
+                    migration_staging.validate_phone(v_app.an_Telefon),
+                    migration_staging.validate_phone(v_app.an_MobilTelefon),
+                    migration_staging.validate_phone(v_app.an_MobilTelefon2),
+                    migration_staging.validate_phone(v_app.an_GeschTelefon),
+                    migration_staging.validate_email(v_app.an_EMail),
+                    migration_staging.convert_datetime(v_app.an_Bewerbungsdatum)::DATE,
+                    migration_staging.convert_datetime(v_app.an_Bestaetigungsdatum)::DATE,
+                    migration_staging.convert_datetime(v_app.an_AktuellesAngebot)::DATE,
+                    migration_staging.convert_datetime(v_app.an_Loeschdatum)::DATE,
+                    migration_staging.convert_datetime(v_app.an_DeaktiviertAm),
+                    TRIM(v_app.an_Wunsch),
+                    TRIM(v_app.an_Vermerk),
+                    COALESCE(migration_staging.convert_boolean(v_app.an_Aktiv), true)
+                )
+                ON CONFLICT (uuid) DO NOTHING;
             
-            v_success := v_success + 1;
+                v_success := v_success + 1;
             
-        EXCEPTION WHEN OTHERS THEN
-            v_errors := v_errors + 1;
-            RAISE WARNING 'Error processing application % % (ID: %): %', 
-                v_app.an_Vorname, v_app.an_Nachname, v_app.an_ID, SQLERRM;
-        END;
-    END LOOP;
+            EXCEPTION WHEN OTHERS THEN
+                v_errors := v_errors + 1;
+                RAISE WARNING 'Error processing application % % (ID: %): %', 
+                    v_app.an_Vorname, v_app.an_Nachname, v_app.an_ID, SQLERRM;
+            END;
+        END LOOP;
+    END;
     
     -- Update log
     UPDATE migration_staging.migration_log 
@@ -452,8 +715,8 @@ BEGIN
         records_processed = v_processed,
         records_success = v_success, 
         records_error = v_errors,
-        completed_at = NOW(),
-        duration_seconds = EXTRACT(EPOCH FROM (NOW() - started_at))
+        completed_at = clock_timestamp(),
+        duration_seconds = EXTRACT(EPOCH FROM (clock_timestamp() - v_start_time))
     WHERE id = v_log_id;
     
     RETURN v_success;
@@ -466,39 +729,37 @@ CREATE OR REPLACE FUNCTION migration_staging.transform_load_application_history(
 ) RETURNS INTEGER AS $$
 DECLARE
     v_log_id BIGINT;
+    v_start_time TIMESTAMP WITH TIME ZONE := clock_timestamp();
     v_processed INTEGER := 0;
     v_success INTEGER := 0;
     v_errors INTEGER := 0;
     v_history RECORD;
-    v_app_id BIGINT;
 BEGIN
     -- Log start
     v_log_id := migration_staging.log_migration_step(
         p_batch_id, 'application_history', 'TRANSFORM_LOAD', 'STARTED', 'Starting application history transformation'
     );
     
-    -- Transform and load application history
+    -- Transform and load application history, resolving the application in the same query
     FOR v_history IN 
-        SELECT * FROM migration_staging.raw_verlauf 
-        WHERE migration_batch_id = p_batch_id 
-          AND verl_An_ID IS NOT NULL
+        SELECT v.*, a.id AS application_id
+        FROM migration_staging.raw_verlauf v
+        LEFT JOIN applications a 
+            ON a.uuid = migration_staging.convert_guid(v.verl_An_ID)
+        WHERE v.migration_batch_id = p_batch_id 
+          AND v.verl_An_ID IS NOT NULL
     LOOP
         BEGIN
             v_processed := v_processed + 1;
             
-            -- Find corresponding application
-            SELECT id INTO v_app_id
-            FROM applications 
-            WHERE uuid = migration_staging.convert_guid(v_history.verl_An_ID);
-            
-            IF v_app_id IS NOT NULL THEN
+            IF v_history.application_id IS NOT NULL THEN
                 INSERT INTO application_history (
                     uuid, application_id, action_type, action_date,
                     gemarkung, flur, parcel, size_info,
                     case_worker, note, comment
                 ) VALUES (
                     migration_staging.convert_guid(v_history.verl_ID),
-                    v_app_id,
+                    v_history.application_id,
                     COALESCE(TRIM(v_history.verl_Art), 'UPD'),
                     COALESCE(migration_staging.convert_datetime(v_history.verl_Datum), NOW()),
                     TRIM(v_history.verl_Gemarkung),
@@ -529,8 +790,8 @@ BEGIN
         records_processed = v_processed,
         records_success = v_success, 
         records_error = v_errors,
-        completed_at = NOW(),
-        duration_seconds = EXTRACT(EPOCH FROM (NOW() - started_at))
+        completed_at = clock_timestamp(),
+        duration_seconds = EXTRACT(EPOCH FROM (clock_timestamp() - v_start_time))
     WHERE id = v_log_id;
     
     RETURN v_success;
@@ -543,44 +804,41 @@ CREATE OR REPLACE FUNCTION migration_staging.transform_load_misc_entities(
 ) RETURNS INTEGER AS $$
 DECLARE
     v_log_id BIGINT;
+    v_start_time TIMESTAMP WITH TIME ZONE := clock_timestamp();
     v_processed INTEGER := 0;
     v_success INTEGER := 0;
     v_errors INTEGER := 0;
     v_record RECORD;
-    v_user_id BIGINT;
+    v_rows INTEGER;
 BEGIN
     -- Log start
     v_log_id := migration_staging.log_migration_step(
         p_batch_id, 'misc_entities', 'TRANSFORM_LOAD', 'STARTED', 'Starting misc entities transformation'
     );
     
-    -- Transform identifiers
+    -- Transform identifiers, resolving the user if one exists
     FOR v_record IN 
-        SELECT * FROM migration_staging.raw_kennungen 
-        WHERE migration_batch_id = p_batch_id
+        SELECT k.*, u.id AS user_id
+        FROM migration_staging.raw_kennungen k
+        LEFT JOIN users u 
+            ON u.uuid = migration_staging.convert_guid(k.Kenn_pers_ID)
+        WHERE k.migration_batch_id = p_batch_id
     LOOP
         BEGIN
             v_processed := v_processed + 1;
             
-            -- Find user if exists
-            v_user_id := NULL;
-            IF v_record.Kenn_pers_ID IS NOT NULL THEN
-                SELECT id INTO v_user_id
-                FROM users 
-                WHERE uuid = migration_staging.convert_guid(v_record.Kenn_pers_ID);
-            END IF;
-            
             INSERT INTO identifiers (uuid, name, domain, user_id, is_active)
             VALUES (
                 migration_staging.convert_guid(v_record.Kenn_ID),
                 TRIM(v_record.Kenn_Name),
                 TRIM(v_record.Kenn_Domaene),
-                v_user_id,
+                v_record.user_id,
                 true
             )
             ON CONFLICT (name, domain) DO UPDATE SET
                 user_id = EXCLUDED.user_id,
-                updated_at = NOW();
+                updated_at = NOW()
+            WHERE identifiers.user_id IS DISTINCT FROM EXCLUDED.user_id;
                 
             v_success := v_success + 1;
             
@@ -590,34 +848,68 @@ BEGIN
         END;
     END LOOP;
     
-    -- Transform field mappings
-    FOR v_record IN 
-        SELECT * FROM migration_staging.raw_mischenfelder 
+    -- Transform field mappings as one set-based statement; fall back to
+    -- row-by-row processing if any row makes it fail
+    BEGIN
+        INSERT INTO field_mappings (uuid, database_field, document_field, comment, is_active)
+        SELECT DISTINCT ON (TRIM(misch_Datenbankfeld))
+            migration_staging.convert_guid(misch_ID),
+            TRIM(misch_Datenbankfeld),
+            TRIM(misch_Dokumentfeld),
+            TRIM(misch_Kommentar),
+            true
+        FROM migration_staging.raw_mischenfelder 
         WHERE migration_batch_id = p_batch_id
-    LOOP
-        BEGIN
-            v_processed := v_processed + 1;
+        ORDER BY TRIM(misch_Datenbankfeld), misch_ID
+        ON CONFLICT (database_field) DO UPDATE SET
+            document_field = EXCLUDED.document_field,
+            comment = EXCLUDED.comment,
+            updated_at = NOW()
+        WHERE (field_mappings.document_field, field_mappings.comment)
+              IS DISTINCT FROM (EXCLUDED.document_field, EXCLUDED.comment);
+        
+        -- Count every source row the row-by-row path would visit as processed and,
+        -- since the statement succeeded, successful; that includes rows merged by
+        -- DISTINCT ON and rows the ON CONFLICT clause left unchanged
+        SELECT COUNT(*) INTO v_rows
+        FROM migration_staging.raw_mischenfelder 
+        WHERE migration_batch_id = p_batch_id;
+        v_processed := v_processed + v_rows;
+        v_success := v_success + v_rows;
+        
+    EXCEPTION WHEN OTHERS THEN
+        RAISE NOTICE 'Bulk field mapping load failed (%), retrying row by row', SQLERRM;
+        
+        FOR v_record IN 
+            SELECT * FROM migration_staging.raw_mischenfelder 
+            WHERE migration_batch_id = p_batch_id
+        LOOP
+            BEGIN
+                v_processed := v_processed + 1;
             
-            INSERT INTO field_mappings (uuid, database_field, document_field, comment, is_active)
-            VALUES (
-                migration_staging.convert_guid(v_record.misch_ID),
-                TRIM(v_record.misch_Datenbankfeld),
-                TRIM(v_record.misch_Dokumentfeld),
-                TRIM(v_record.misch_Kommentar),
-                true
-            )
-            ON CONFLICT (database_field) DO UPDATE SET
-                document_field = EXCLUDED.document_field,
-                comment = EXCLUDED.comment,
-                updated_at = NOW();
+                INSERT INTO field_mappings (uuid, database_field, document_field, comment, is_active)
+                VALUES (
+                    migration_staging.convert_guid(v_record.misch_ID),
+                    TRIM(v_record.misch_Datenbankfeld),
+                    TRIM(v_record.misch_Dokumentfeld),
+                    TRIM(v_record.misch_Kommentar),
+                    true
+                )
+                ON CONFLICT (database_field) DO UPDATE SET
+                    document_field = EXCLUDED.document_field,
+                    comment = EXCLUDED.comment,
+                    updated_at = NOW()
+                WHERE (field_mappings.document_field, field_mappings.comment)
+                      IS DISTINCT FROM (EXCLUDED.document_field, EXCLUDED.comment);
                 
-            v_success := v_success + 1;
+                v_success := v_success + 1;
             
-        EXCEPTION WHEN OTHERS THEN
-            v_errors := v_errors + 1;
-            RAISE WARNING 'Error processing field mapping %: %', v_record.misch_Datenbankfeld, SQLERRM;
-        END;
-    END LOOP;
+            EXCEPTION WHEN OTHERS THEN
+                v_errors := v_errors + 1;
+                RAISE WARNING 'Error processing field mapping %: %', v_record.misch_Datenbankfeld, SQLERRM;
+            END;
+        END LOOP;
+    END;
     
     -- Update log
     UPDATE migration_staging.migration_log 
@@ -626,8 +918,8 @@ BEGIN
         records_processed = v_processed,
         records_success = v_success, 
         records_error = v_errors,
-        completed_at = NOW(),
-        duration_seconds = EXTRACT(EPOCH FROM (NOW() - started_at))
+        completed_at = clock_timestamp(),
+        duration_seconds = EXTRACT(EPOCH FROM (clock_timestamp() - v_start_time))
     WHERE id = v_log_id;
     
     RETURN v_success;
@@ -650,9 +942,17 @@ CREATE OR REPLACE FUNCTION migration_staging.run_full_migration(
     duration_seconds INTEGER
 ) AS $$
 DECLARE
-    v_start_time TIMESTAMP WITH TIME ZONE := NOW();
+    v_start_time TIMESTAMP WITH TIME ZONE := clock_timestamp();
     v_results RECORD;
 BEGIN
+    -- Only one migration run at a time; the lock is released at transaction end
+    IF NOT pg_try_advisory_xact_lock(hashtext('migration_staging.run_full_migration')) THEN
+        RAISE EXCEPTION 'Another migration run is already in progress, cannot start batch %', p_batch_id;
+    END IF;
+    
+    -- A crash only means rerunning the batch, so don't wait for the WAL flush on commit
+    PERFORM set_config('synchronous_commit', 'off', true);
+    
     RAISE NOTICE 'Starting full migration for batch %', p_batch_id;
     
     -- Execute transformations in dependency order
@@ -690,7 +990,7 @@ BEGIN
     ORDER BY ml.completed_at;
     
     RAISE NOTICE 'Full migration completed for batch % in % seconds', 
-        p_batch_id, EXTRACT(EPOCH FROM (NOW() - v_start_time));
+        p_batch_id, EXTRACT(EPOCH FROM (clock_timestamp() - v_start_time));
 END;
 $$ LANGUAGE plpgsql;
 
@@ -67,12 +67,12 @@ DECLARE
     table_name TEXT := TG_TABLE_SCHEMA || '.' || TG_TABLE_NAME;
 BEGIN
     IF TG_OP = 'UPDATE' THEN
-        old_values := row_to_json(OLD);
-        new_values := row_to_json(NEW);
+        old_values := to_jsonb(OLD);
+        new_values := to_jsonb(NEW);
     ELSIF TG_OP = 'DELETE' THEN
-        old_values := row_to_json(OLD);
+        old_values := to_jsonb(OLD);
     ELSIF TG_OP = 'INSERT' THEN
-        new_values := row_to_json(NEW);
+        new_values := to_jsonb(NEW);
     END IF;
     
     INSERT INTO audit.audit_log (table_name, operation, old_values, new_values)
@@ -36,7 +36,7 @@ resource "azurerm_postgresql_flexible_server" "main" {
   
   sku_name                     = var.sku_name
   storage_mb                   = var.storage_mb * 1024
-  version                      = "15"
+  version                      = "16"
   zone                         = var.environment == "prod" ? "1" : null
   backup_retention_days        = var.backup_retention_days
   geo_redundant_backup_enabled = var.geo_redundant_backup
@@ -22,7 +22,7 @@ BEGIN
     SELECT 
         'postgresql_version' as check_name,
         CASE 
-            WHEN current_setting('server_version_num')::INTEGER >= 150000 THEN 'PASS'
+            WHEN current_setting('server_version_num')::INTEGER >= 160000 THEN 'PASS'
             ELSE 'FAIL'
         END as status,
         'PostgreSQL version: ' || version() as details,
@@ -212,9 +212,16 @@ $$ LANGUAGE plpgsql;
 -- DATA COMPARISON AND VALIDATION FUNCTIONS
 -- =============================================================================
 
--- Function to compare record counts between staging and target tables
+-- Function to compare record counts between staging and target tables.
+-- With p_use_estimates the two large target tables are counted from the
+-- planner statistics instead of a full scan.
+-- Drop the old single-argument version, which would otherwise remain as an
+-- ambiguous overload of compare_record_counts(batch_id)
+DROP FUNCTION IF EXISTS migration_staging.compare_record_counts(INTEGER);
+
 CREATE OR REPLACE FUNCTION migration_staging.compare_record_counts(
-    p_batch_id INTEGER
+    p_batch_id INTEGER,
+    p_use_estimates BOOLEAN DEFAULT false
 ) RETURNS TABLE(
     entity_name TEXT,
     staging_count BIGINT,
@@ -223,6 +230,11 @@ CREATE OR REPLACE FUNCTION migration_staging.compare_record_counts(
     match_status TEXT
 ) AS $$
 BEGIN
+    IF p_use_estimates THEN
+        -- Refresh reltuples from a sample rather than reading every page
+        ANALYZE applications, application_history;
+    END IF;
+    
     RETURN QUERY
     WITH staging_counts AS (
         SELECT 'districts' as entity, COUNT(*) as staging_count FROM migration_staging.raw_bezirk WHERE migration_batch_id = p_batch_id
@@ -244,7 +256,10 @@ BEGIN
     target_counts AS (
         SELECT 'districts' as entity, COUNT(*) as target_count FROM districts
         UNION ALL
-        SELECT 'applications', COUNT(*) FROM applications
+        SELECT 'applications', CASE 
+            WHEN p_use_estimates THEN (SELECT reltuples::BIGINT FROM pg_class WHERE oid = 'applications'::regclass)
+            ELSE (SELECT COUNT(*) FROM applications)
+        END
         UNION ALL
         SELECT 'users', COUNT(*) FROM users
         UNION ALL
@@ -254,7 +269,10 @@ BEGIN
         UNION ALL
         SELECT 'cadastral_districts', COUNT(*) FROM cadastral_districts
         UNION ALL
-        SELECT 'application_history', COUNT(*) FROM application_history
+        SELECT 'application_history', CASE 
+            WHEN p_use_estimates THEN (SELECT reltuples::BIGINT FROM pg_class WHERE oid = 'application_history'::regclass)
+            ELSE (SELECT COUNT(*) FROM application_history)
+        END
         UNION ALL
         SELECT 'identifiers', COUNT(*) FROM identifiers
     )
@@ -423,7 +441,7 @@ CREATE OR REPLACE FUNCTION migration_staging.execute_rollback(
     details TEXT
 ) AS $$
 DECLARE
-    v_start_time TIMESTAMP := NOW();
+    v_start_time TIMESTAMP WITH TIME ZONE := clock_timestamp();
     v_records_deleted BIGINT;
 BEGIN
     -- Log rollback start
@@ -557,7 +575,7 @@ BEGIN
         'ROLLBACK',
         'COMPLETED',
         'SUCCESS',
-        format('%s rollback completed in %s seconds', p_rollback_type, EXTRACT(EPOCH FROM (NOW() - v_start_time)))
+        format('%s rollback completed in %s seconds', p_rollback_type, EXTRACT(EPOCH FROM (clock_timestamp() - v_start_time)))
     );
 END;
 $$ LANGUAGE plpgsql;
@@ -577,129 +595,65 @@ CREATE OR REPLACE FUNCTION migration_staging.generate_migration_report(
 ) AS $$
 BEGIN
     RETURN QUERY
-    -- Migration overview
-    SELECT 
-        'Overview' as section,
-        'Batch ID' as metric,
-        p_batch_id::TEXT as value,
-        'INFO' as status
-    
-    UNION ALL
-    
-    SELECT 
-        'Overview',
-        'Migration Start Time',
-        MIN(started_at)::TEXT,
-        'INFO'
-    FROM migration_staging.migration_log 
-    WHERE batch_id = p_batch_id
-    
-    UNION ALL
-    
-    SELECT 
-        'Overview',
-        'Migration End Time',
-        MAX(completed_at)::TEXT,
-        'INFO'
-    FROM migration_staging.migration_log 
-    WHERE batch_id = p_batch_id
-    
-    UNION ALL
-    
-    SELECT 
-        'Overview',
-        'Total Duration (seconds)',
-        EXTRACT(EPOCH FROM (MAX(completed_at) - MIN(started_at)))::TEXT,
-        'INFO'
-    FROM migration_staging.migration_log 
-    WHERE batch_id = p_batch_id
-    
-    UNION ALL
-    
-    -- Data volume metrics
-    SELECT 
-        'Data Volume',
-        'Total Records Processed',
-        SUM(records_processed)::TEXT,
-        CASE WHEN SUM(records_processed) > 0 THEN 'SUCCESS' ELSE 'WARNING' END
-    FROM migration_staging.migration_log 
-    WHERE batch_id = p_batch_id AND operation = 'TRANSFORM_LOAD'
-    
-    UNION ALL
-    
-    SELECT 
-        'Data Volume',
-        'Total Records Success',
-        SUM(records_success)::TEXT,
-        CASE WHEN SUM(records_success) = SUM(records_processed) THEN 'SUCCESS' ELSE 'WARNING' END
-    FROM migration_staging.migration_log 
-    WHERE batch_id = p_batch_id AND operation = 'TRANSFORM_LOAD'
-    
-    UNION ALL
-    
-    SELECT 
-        'Data Volume',
-        'Total Records Error',
-        SUM(records_error)::TEXT,
-        CASE WHEN SUM(records_error) = 0 THEN 'SUCCESS' ELSE 'ERROR' END
-    FROM migration_staging.migration_log 
-    WHERE batch_id = p_batch_id AND operation = 'TRANSFORM_LOAD'
-    
-    UNION ALL
-    
-    SELECT 
-        'Data Volume',
-        'Success Rate (%)',
-        ROUND(100.0 * SUM(records_success) / NULLIF(SUM(records_processed), 0), 2)::TEXT,
-        CASE 
-            WHEN ROUND(100.0 * SUM(records_success) / NULLIF(SUM(records_processed), 0), 2) >= 99 THEN 'SUCCESS'
-            WHEN ROUND(100.0 * SUM(records_success) / NULLIF(SUM(records_processed), 0), 2) >= 95 THEN 'WARNING'
-            ELSE 'ERROR'
-        END
-    FROM migration_staging.migration_log 
-    WHERE batch_id = p_batch_id AND operation = 'TRANSFORM_LOAD'
-    
-    UNION ALL
-    
-    -- Performance metrics
-    SELECT 
-        'Performance',
-        'Average Processing Speed (records/second)',
-        ROUND(AVG(records_processed::NUMERIC / NULLIF(duration_seconds, 0)), 2)::TEXT,
-        'INFO'
-    FROM migration_staging.migration_log 
-    WHERE batch_id = p_batch_id AND operation = 'TRANSFORM_LOAD' AND duration_seconds > 0
-    
-    UNION ALL
-    
-    -- Quality metrics
-    SELECT 
-        'Quality',
-        'Data Quality Rules Executed',
-        COUNT(*)::TEXT,
-        CASE WHEN COUNT(*) > 0 THEN 'SUCCESS' ELSE 'WARNING' END
-    FROM data_quality.check_results 
-    WHERE batch_id = p_batch_id
-    
-    UNION ALL
-    
-    SELECT 
-        'Quality',
-        'Quality Rules Passed',
-        COUNT(*) FILTER (WHERE violations_count = 0)::TEXT,
-        'INFO'
-    FROM data_quality.check_results 
-    WHERE batch_id = p_batch_id
-    
-    UNION ALL
-    
-    SELECT 
-        'Quality',
-        'Total Quality Violations',
-        SUM(violations_count)::TEXT,
-        CASE WHEN SUM(violations_count) = 0 THEN 'SUCCESS' ELSE 'WARNING' END
-    FROM data_quality.check_results 
-    WHERE batch_id = p_batch_id;
+    -- Aggregate the batch log and quality results once, then unpivot into report rows
+    WITH log_stats AS (
+        SELECT 
+            MIN(started_at) AS started_at,
+            MAX(completed_at) AS completed_at,
+            SUM(records_processed) FILTER (WHERE operation = 'TRANSFORM_LOAD') AS processed,
+            SUM(records_success) FILTER (WHERE operation = 'TRANSFORM_LOAD') AS success,
+            SUM(records_error) FILTER (WHERE operation = 'TRANSFORM_LOAD') AS errors,
+            AVG(records_processed::NUMERIC / duration_seconds) 
+                FILTER (WHERE operation = 'TRANSFORM_LOAD' AND duration_seconds > 0) AS avg_speed
+        FROM migration_staging.migration_log 
+        WHERE batch_id = p_batch_id
+    ),
+    quality_stats AS (
+        SELECT 
+            COUNT(*) AS rules_executed,
+            COUNT(*) FILTER (WHERE violations_count = 0) AS rules_passed,
+            SUM(violations_count) AS violations
+        FROM data_quality.check_results 
+        WHERE batch_id = p_batch_id
+    )
+    SELECT r.report_section, r.report_metric, r.report_value, r.report_status
+    FROM log_stats l
+    CROSS JOIN quality_stats q
+    CROSS JOIN LATERAL (
+        SELECT ROUND(100.0 * l.success / NULLIF(l.processed, 0), 2) AS success_rate
+    ) rate
+    CROSS JOIN LATERAL (VALUES
+        -- Migration overview
+        ('Overview', 'Batch ID', p_batch_id::TEXT, 'INFO'),
+        ('Overview', 'Migration Start Time', l.started_at::TEXT, 'INFO'),
+        ('Overview', 'Migration End Time', l.completed_at::TEXT, 'INFO'),
+        ('Overview', 'Total Duration (seconds)', 
+            EXTRACT(EPOCH FROM (l.completed_at - l.started_at))::TEXT, 'INFO'),
+        
+        -- Data volume metrics
+        ('Data Volume', 'Total Records Processed', l.processed::TEXT,
+            CASE WHEN l.processed > 0 THEN 'SUCCESS' ELSE 'WARNING' END),
+        ('Data Volume', 'Total Records Success', l.success::TEXT,
+            CASE WHEN l.success = l.processed THEN 'SUCCESS' ELSE 'WARNING' END),
+        ('Data Volume', 'Total Records Error', l.errors::TEXT,
+            CASE WHEN l.errors = 0 THEN 'SUCCESS' ELSE 'ERROR' END),
+        ('Data Volume', 'Success Rate (%)', rate.success_rate::TEXT,
+            CASE 
+                WHEN rate.success_rate >= 99 THEN 'SUCCESS'
+                WHEN rate.success_rate >= 95 THEN 'WARNING'
+                ELSE 'ERROR'
+            END),
+        
+        -- Performance metrics
+        ('Performance', 'Average Processing Speed (records/second)', ROUND(l.avg_speed, 2)::TEXT, 'INFO'),
+        
+        -- Quality metrics
+        ('Quality', 'Data Quality Rules Executed', q.rules_executed::TEXT,
+            CASE WHEN q.rules_executed > 0 THEN 'SUCCESS' ELSE 'WARNING' END),
+        ('Quality', 'Quality Rules Passed', q.rules_passed::TEXT, 'INFO'),
+        ('Quality', 'Total Quality Violations', q.violations::TEXT,
+            CASE WHEN q.violations = 0 THEN 'SUCCESS' ELSE 'WARNING' END)
+    ) AS r(report_section, report_metric, report_value, report_status);
 END;
 $$ LANGUAGE plpgsql;
 
@@ -710,7 +664,7 @@ $$ LANGUAGE plpgsql;
 COMMENT ON FUNCTION migration_staging.validate_migration_prerequisites() IS 'Validates all prerequisites before starting migration';
 COMMENT ON FUNCTION migration_staging.initialize_migration_batch() IS 'Initializes a new migration batch with prerequisite validation';
 COMMENT ON FUNCTION migration_staging.finalize_migration_batch(INTEGER) IS 'Finalizes migration batch and calculates success metrics';
-COMMENT ON FUNCTION migration_staging.compare_record_counts(INTEGER) IS 'Compares record counts between staging and target tables';
+COMMENT ON FUNCTION migration_staging.compare_record_counts(INTEGER, BOOLEAN) IS 'Compares record counts between staging and target tables';
 COMMENT ON FUNCTION migration_staging.validate_business_data_integrity(INTEGER) IS 'Validates critical business data integrity after migration';
 COMMENT ON FUNCTION migration_staging.create_rollback_checkpoint(INTEGER, TEXT) IS 'Creates rollback checkpoint for migration recovery';
 COMMENT ON FUNCTION migration_staging.execute_rollback(INTEGER, TEXT) IS 'Executes migration rollback (partial or full)';
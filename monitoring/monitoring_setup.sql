@@ -93,25 +93,15 @@ DECLARE
     v_connection_count INTEGER;
     v_active_queries INTEGER;
     v_cache_hit_ratio NUMERIC;
-    v_table_stats RECORD;
+    v_table_metrics INTEGER;
 BEGIN
     -- Database size
     SELECT pg_database_size(current_database()) INTO v_db_size;
-    INSERT INTO monitoring.metrics (metric_name, metric_category, metric_value, metric_unit, tags)
-    VALUES ('database_size_bytes', 'CAPACITY', v_db_size, 'bytes', '{"database": "' || current_database() || '"}'::JSONB);
-    v_metrics_collected := v_metrics_collected + 1;
-    
-    -- Connection count
-    SELECT COUNT(*) INTO v_connection_count FROM pg_stat_activity WHERE datname = current_database();
-    INSERT INTO monitoring.metrics (metric_name, metric_category, metric_value, metric_unit, tags)
-    VALUES ('active_connections', 'SYSTEM', v_connection_count, 'count', '{"database": "' || current_database() || '"}'::JSONB);
-    v_metrics_collected := v_metrics_collected + 1;
     
-    -- Active queries
-    SELECT COUNT(*) INTO v_active_queries FROM pg_stat_activity WHERE datname = current_database() AND state = 'active';
-    INSERT INTO monitoring.metrics (metric_name, metric_category, metric_value, metric_unit, tags)
-    VALUES ('active_queries', 'PERFORMANCE', v_active_queries, 'count', '{"database": "' || current_database() || '"}'::JSONB);
-    v_metrics_collected := v_metrics_collected + 1;
+    -- Connection count and active queries
+    SELECT COUNT(*), COUNT(*) FILTER (WHERE state = 'active')
+    INTO v_connection_count, v_active_queries
+    FROM pg_stat_activity WHERE datname = current_database();
     
     -- Cache hit ratio
     SELECT 
@@ -120,63 +110,38 @@ BEGIN
             ELSE ROUND(100.0 * heap_blks_hit / (heap_blks_read + heap_blks_hit), 2)
         END INTO v_cache_hit_ratio
     FROM (
-        SELECT SUM(heap_blks_read) as heap_blks_read, SUM(heap_blks_hit) as heap_blks_hit
-        FROM pg_stat_user_tables
+        SELECT COALESCE(SUM(heap_blks_read), 0) as heap_blks_read, COALESCE(SUM(heap_blks_hit), 0) as heap_blks_hit
+        FROM pg_statio_user_tables
     ) cache_stats;
     
     INSERT INTO monitoring.metrics (metric_name, metric_category, metric_value, metric_unit, tags)
-    VALUES ('cache_hit_ratio', 'PERFORMANCE', v_cache_hit_ratio, 'percent', '{"database": "' || current_database() || '"}'::JSONB);
-    v_metrics_collected := v_metrics_collected + 1;
+    VALUES 
+        ('database_size_bytes', 'CAPACITY', v_db_size, 'bytes', jsonb_build_object('database', current_database())),
+        ('active_connections', 'SYSTEM', v_connection_count, 'count', jsonb_build_object('database', current_database())),
+        ('active_queries', 'PERFORMANCE', v_active_queries, 'count', jsonb_build_object('database', current_database())),
+        ('cache_hit_ratio', 'PERFORMANCE', v_cache_hit_ratio, 'percent', jsonb_build_object('database', current_database()));
+    v_metrics_collected := v_metrics_collected + 4;
     
-    -- Table-specific metrics for key tables
-    FOR v_table_stats IN 
-        SELECT 
-            schemaname, 
-            tablename,
-            n_tup_ins + n_tup_upd + n_tup_del as total_modifications,
-            n_tup_ins as inserts,
-            n_tup_upd as updates,
-            n_tup_del as deletes,
-            seq_scan,
-            idx_scan,
-            n_live_tup as live_tuples
-        FROM pg_stat_user_tables 
-        WHERE tablename IN ('applications', 'application_history', 'districts', 'users')
-    LOOP
+    -- Table-specific metrics for key tables, written in one statement
+    INSERT INTO monitoring.metrics (metric_name, metric_category, metric_value, metric_unit, tags)
+    SELECT m.metric_name, m.metric_category, m.metric_value, m.metric_unit,
+           jsonb_build_object('table', t.relname, 'schema', t.schemaname)
+    FROM pg_stat_user_tables t
+    CROSS JOIN LATERAL (VALUES
         -- Table modification activity
-        INSERT INTO monitoring.metrics (metric_name, metric_category, metric_value, metric_unit, tags)
-        VALUES (
-            'table_modifications_total', 
-            'SYSTEM', 
-            v_table_stats.total_modifications, 
-            'count',
-            jsonb_build_object('table', v_table_stats.tablename, 'schema', v_table_stats.schemaname)
-        );
-        
+        ('table_modifications_total', 'SYSTEM', (t.n_tup_ins + t.n_tup_upd + t.n_tup_del)::NUMERIC, 'count'),
         -- Index usage ratio
-        INSERT INTO monitoring.metrics (metric_name, metric_category, metric_value, metric_unit, tags)
-        VALUES (
-            'table_index_usage_ratio', 
-            'PERFORMANCE', 
+        ('table_index_usage_ratio', 'PERFORMANCE',
             CASE 
-                WHEN v_table_stats.seq_scan + v_table_stats.idx_scan = 0 THEN 0 
-                ELSE ROUND(100.0 * v_table_stats.idx_scan / (v_table_stats.seq_scan + v_table_stats.idx_scan), 2)
-            END, 
-            'percent',
-            jsonb_build_object('table', v_table_stats.tablename, 'schema', v_table_stats.schemaname)
-        );
-        
+                WHEN COALESCE(t.seq_scan, 0) + COALESCE(t.idx_scan, 0) = 0 THEN 0 
+                ELSE ROUND(100.0 * COALESCE(t.idx_scan, 0) / (COALESCE(t.seq_scan, 0) + COALESCE(t.idx_scan, 0)), 2)
+            END, 'percent'),
         -- Live tuples count
-        INSERT INTO monitoring.metrics (metric_name, metric_category, metric_value, metric_unit, tags)
-        VALUES (
-            'table_live_tuples', 
-            'CAPACITY', 
-            v_table_stats.live_tuples, 
-            'count',
-            jsonb_build_object('table', v_table_stats.tablename, 'schema', v_table_stats.schemaname)
-        );
-        v_metrics_collected := v_metrics_collected + 3;
-    END LOOP;
+        ('table_live_tuples', 'CAPACITY', t.n_live_tup::NUMERIC, 'count')
+    ) AS m(metric_name, metric_category, metric_value, metric_unit)
+    WHERE t.relname IN ('applications', 'application_history', 'districts', 'users');
+    GET DIAGNOSTICS v_table_metrics = ROW_COUNT;
+    v_metrics_collected := v_metrics_collected + v_table_metrics;
     
     RETURN v_metrics_collected;
 END;
@@ -194,49 +159,31 @@ DECLARE
     v_applications_this_month INTEGER;
     v_avg_processing_days NUMERIC;
 BEGIN
-    -- Active applications count
-    SELECT COUNT(*) INTO v_active_applications FROM applications WHERE is_active = true;
-    INSERT INTO monitoring.metrics (metric_name, metric_category, metric_value, metric_unit)
-    VALUES ('active_applications_total', 'BUSINESS', v_active_applications, 'count');
-    v_metrics_collected := v_metrics_collected + 1;
-    
-    -- Waiting list counts
-    SELECT COUNT(*) INTO v_waiting_list_32_count FROM applications 
-    WHERE is_active = true AND waiting_list_number_32 IS NOT NULL;
-    INSERT INTO monitoring.metrics (metric_name, metric_category, metric_value, metric_unit)
-    VALUES ('waiting_list_32_count', 'BUSINESS', v_waiting_list_32_count, 'count');
-    
-    SELECT COUNT(*) INTO v_waiting_list_33_count FROM applications 
-    WHERE is_active = true AND waiting_list_number_33 IS NOT NULL;
-    INSERT INTO monitoring.metrics (metric_name, metric_category, metric_value, metric_unit)
-    VALUES ('waiting_list_33_count', 'BUSINESS', v_waiting_list_33_count, 'count');
-    v_metrics_collected := v_metrics_collected + 2;
-    
-    -- Daily applications
-    SELECT COUNT(*) INTO v_applications_today FROM applications 
-    WHERE application_date = CURRENT_DATE;
-    INSERT INTO monitoring.metrics (metric_name, metric_category, metric_value, metric_unit)
-    VALUES ('applications_today', 'BUSINESS', v_applications_today, 'count');
-    
-    -- Monthly applications
-    SELECT COUNT(*) INTO v_applications_this_month FROM applications 
-    WHERE application_date >= DATE_TRUNC('month', CURRENT_DATE);
-    INSERT INTO monitoring.metrics (metric_name, metric_category, metric_value, metric_unit)
-    VALUES ('applications_this_month', 'BUSINESS', v_applications_this_month, 'count');
-    v_metrics_collected := v_metrics_collected + 2;
-    
-    -- Average processing time
+    -- Gather all application KPIs in a single scan
     SELECT 
-        COALESCE(AVG(EXTRACT(DAYS FROM (confirmation_date - application_date))), 0)
-    INTO v_avg_processing_days
-    FROM applications 
-    WHERE confirmation_date IS NOT NULL 
-      AND application_date IS NOT NULL
-      AND confirmation_date >= NOW() - INTERVAL '30 days';
+        COUNT(*) FILTER (WHERE is_active = true),
+        COUNT(*) FILTER (WHERE is_active = true AND waiting_list_number_32 IS NOT NULL),
+        COUNT(*) FILTER (WHERE is_active = true AND waiting_list_number_33 IS NOT NULL),
+        COUNT(*) FILTER (WHERE application_date = CURRENT_DATE),
+        COUNT(*) FILTER (WHERE application_date >= DATE_TRUNC('month', CURRENT_DATE)),
+        COALESCE(AVG(confirmation_date - application_date) FILTER (
+            WHERE confirmation_date IS NOT NULL 
+              AND application_date IS NOT NULL
+              AND confirmation_date >= NOW() - INTERVAL '30 days'
+        ), 0)
+    INTO v_active_applications, v_waiting_list_32_count, v_waiting_list_33_count,
+         v_applications_today, v_applications_this_month, v_avg_processing_days
+    FROM applications;
     
     INSERT INTO monitoring.metrics (metric_name, metric_category, metric_value, metric_unit)
-    VALUES ('avg_processing_time_days', 'BUSINESS', v_avg_processing_days, 'days');
-    v_metrics_collected := v_metrics_collected + 1;
+    VALUES 
+        ('active_applications_total', 'BUSINESS', v_active_applications, 'count'),
+        ('waiting_list_32_count', 'BUSINESS', v_waiting_list_32_count, 'count'),
+        ('waiting_list_33_count', 'BUSINESS', v_waiting_list_33_count, 'count'),
+        ('applications_today', 'BUSINESS', v_applications_today, 'count'),
+        ('applications_this_month', 'BUSINESS', v_applications_this_month, 'count'),
+        ('avg_processing_time_days', 'BUSINESS', v_avg_processing_days, 'days');
+    v_metrics_collected := v_metrics_collected + 6;
     
     RETURN v_metrics_collected;
 END;
@@ -514,13 +461,13 @@ DECLARE
 BEGIN
     -- Delete old metrics
     DELETE FROM monitoring.metrics 
-    WHERE timestamp < NOW() - (p_retention_days || ' days')::INTERVAL;
+    WHERE timestamp < NOW() - make_interval(days => p_retention_days);
     GET DIAGNOSTICS v_deleted_count = ROW_COUNT;
     
     -- Delete old resolved alerts
     DELETE FROM monitoring.alert_history
     WHERE resolved_at IS NOT NULL 
-      AND resolved_at < NOW() - (p_retention_days || ' days')::INTERVAL;
+      AND resolved_at < NOW() - make_interval(days => p_retention_days);
     
     RETURN v_deleted_count;
 END;
@@ -563,16 +510,20 @@ BEGIN
     
     UNION ALL
     
-    -- Critical table counts
+    -- Critical table contents; stops at the first active application instead
+    -- of counting all of them on every probe
     SELECT 
         'data_integrity',
         CASE 
-            WHEN COUNT(*) > 0 THEN 'healthy'
+            WHEN a.has_active THEN 'healthy'
             ELSE 'unhealthy'
         END,
-        'Active applications: ' || COUNT(*),
+        CASE 
+            WHEN a.has_active THEN 'Active applications present'
+            ELSE 'No active applications'
+        END,
         NOW()
-    FROM applications WHERE is_active = true
+    FROM (SELECT EXISTS (SELECT 1 FROM applications WHERE is_active = true) AS has_active) a
     
     UNION ALL
     
@@ -117,13 +117,13 @@ INSERT INTO data_quality.rules (rule_name, description, table_name, column_name,
 
 -- REFERENCE validations
 ('cadastral_districts_district_reference', 'Cadastral districts must reference valid districts', 'cadastral_districts', 'district_id', 'REFERENCE',
- 'SELECT cd.id, cd.district_id FROM cadastral_districts cd LEFT JOIN districts d ON cd.district_id = d.id WHERE d.id IS NULL', 'ERROR'),
+ 'SELECT cd.id, cd.district_id FROM cadastral_districts cd WHERE NOT EXISTS (SELECT 1 FROM districts d WHERE d.id = cd.district_id)', 'ERROR'),
 
 ('application_history_application_reference', 'Application history must reference valid applications', 'application_history', 'application_id', 'REFERENCE',
- 'SELECT ah.id, ah.application_id FROM application_history ah LEFT JOIN applications a ON ah.application_id = a.id WHERE a.id IS NULL', 'ERROR'),
+ 'SELECT ah.id, ah.application_id FROM application_history ah WHERE NOT EXISTS (SELECT 1 FROM applications a WHERE a.id = ah.application_id)', 'ERROR'),
 
 ('application_history_user_reference', 'Application history user references must be valid', 'application_history', 'user_id', 'REFERENCE',
- 'SELECT ah.id, ah.user_id FROM application_history ah LEFT JOIN users u ON ah.user_id = u.id WHERE ah.user_id IS NOT NULL AND u.id IS NULL', 'WARNING'),
+ 'SELECT ah.id, ah.user_id FROM application_history ah WHERE ah.user_id IS NOT NULL AND NOT EXISTS (SELECT 1 FROM users u WHERE u.id = ah.user_id)', 'WARNING'),
 
 -- CUSTOM business logic validations
 ('applications_date_consistency', 'Application confirmation date must be after application date', 'applications', 'application_date,confirmation_date', 'CUSTOM',
@@ -182,13 +182,13 @@ BEGIN
     v_start_time := clock_timestamp();
     
     BEGIN
-        -- Execute the rule query to count violations
-        EXECUTE FORMAT('SELECT COUNT(*) FROM (%s) violations', v_rule.rule_query) INTO v_violations_count;
-        
-        -- Get sample violations (max 10) for detailed analysis
-        IF v_violations_count > 0 THEN
-            EXECUTE FORMAT('SELECT jsonb_agg(row_to_json(t)) FROM (SELECT * FROM (%s) violations LIMIT 10) t', v_rule.rule_query) INTO v_sample_violations;
-        END IF;
+        -- Execute the rule query once to count violations and collect
+        -- sample violations (max 10) for detailed analysis
+        EXECUTE FORMAT(
+            'SELECT COUNT(*), jsonb_agg(row_to_json(v)::JSONB - ''violation_rn'') FILTER (WHERE v.violation_rn <= 10)
+             FROM (SELECT t.*, row_number() OVER () AS violation_rn FROM (%s) t) v',
+            v_rule.rule_query
+        ) INTO v_violations_count, v_sample_violations;
         
         v_end_time := clock_timestamp();
         
@@ -111,15 +111,13 @@ namespace KGV.Infrastructure.Patterns.CircuitBreaker
         /// </summary>
         private static IAsyncPolicy<HttpResponseMessage> GetRetryPolicy()
         {
-            var jitterer = new Random();
-            
             return HttpPolicyExtensions
                 .HandleTransientHttpError()
                 .WaitAndRetryAsync(
                     retryCount: 3,
                     sleepDurationProvider: retryAttempt => 
                         TimeSpan.FromSeconds(Math.Pow(2, retryAttempt)) +
-                        TimeSpan.FromMilliseconds(jitterer.Next(0, 100)),
+                        TimeSpan.FromMilliseconds(Random.Shared.Next(0, 100)),
                     onRetry: (outcome, timespan, retryCount, context) =>
                     {
                         var logger = context.Values.ContainsKey("logger") 
@@ -25,7 +25,7 @@ namespace KGV.Infrastructure.Patterns.StranglerFig
         private readonly ILogger<StranglerFigMiddleware> _logger;
         private readonly IMetricsCollector _metrics;
         private readonly MigrationRouteConfig[] _routes;
-        private readonly Random _random = new Random();
+        private readonly Regex[] _routePatterns;
 
         public StranglerFigMiddleware(
             RequestDelegate next,
@@ -40,6 +40,9 @@ namespace KGV.Infrastructure.Patterns.StranglerFig
             _logger = logger;
             _metrics = metrics;
             _routes = LoadMigrationRoutes();
+            _routePatterns = _routes
+                .Select(r => new Regex(r.Pattern, RegexOptions.Compiled | RegexOptions.CultureInvariant))
+                .ToArray();
         }
 
         public async Task InvokeAsync(HttpContext context)
@@ -76,9 +79,10 @@ namespace KGV.Infrastructure.Patterns.StranglerFig
 
         private RoutingDecision DetermineRouting(string path, string method)
         {
-            foreach (var route in _routes)
+            for (var i = 0; i < _routes.Length; i++)
             {
-                if (!Regex.IsMatch(path, route.Pattern))
+                var route = _routes[i];
+                if (!_routePatterns[i].IsMatch(path))
                     continue;
 
                 // Check if specific HTTP method is configured
@@ -125,7 +129,7 @@ namespace KGV.Infrastructure.Patterns.StranglerFig
                 }
 
                 // A/B testing based on percentage
-                var randomValue = _random.Next(100);
+                var randomValue = Random.Shared.Next(100);
                 var target = randomValue < route.MigrationPercentage 
                     ? RoutingTarget.NewSystem 
                     : RoutingTarget.LegacySystem;
@@ -167,10 +171,10 @@ namespace KGV.Infrastructure.Patterns.StranglerFig
             try
             {
                 // Create proxy request
-                var proxyRequest = await CreateProxyRequest(context, client.BaseAddress);
+                using var proxyRequest = await CreateProxyRequest(context, client.BaseAddress);
                 
                 // Send to legacy system
-                var response = await client.SendAsync(proxyRequest);
+                using var response = await client.SendAsync(proxyRequest);
                 
                 // Copy response back to client
                 await CopyProxyResponse(context, response);
@@ -207,8 +211,8 @@ namespace KGV.Infrastructure.Patterns.StranglerFig
                     try
                     {
                         var client = _httpClientFactory.CreateClient("LegacySystem");
-                        var legacyRequest = CreateLegacyRequest(context, originalBody);
-                        var legacyResponse = await client.SendAsync(legacyRequest);
+                        using var legacyRequest = CreateLegacyRequest(context, originalBody);
+                        using var legacyResponse = await client.SendAsync(legacyRequest);
                         
                         if (!legacyResponse.IsSuccessStatusCode)
                         {
@@ -245,7 +249,7 @@ namespace KGV.Infrastructure.Patterns.StranglerFig
             var newSystemResponse = context.Response;
             
             // Wait for legacy response
-            var legacyResponse = await legacyTask;
+            using var legacyResponse = await legacyTask;
             
             // Compare responses for validation
             await CompareResponses(
@@ -349,7 +353,7 @@ namespace KGV.Infrastructure.Patterns.StranglerFig
         private async Task<HttpResponseMessage> CallLegacySystem(HttpContext context, string body)
         {
             var client = _httpClientFactory.CreateClient("LegacySystem");
-            var request = CreateLegacyRequest(context, body);
+            using var request = CreateLegacyRequest(context, body);
             return await client.SendAsync(request);
         }
 
@@ -402,8 +406,11 @@ namespace KGV.Infrastructure.Patterns.StranglerFig
         private async Task StoreComparisonResult(ResponseComparison comparison)
         {
             // Store in database or file for analysis
-            var json = JsonSerializer.Serialize(comparison);
-            _logger.LogDebug("Comparison result: {Json}", json);
+            if (_logger.IsEnabled(LogLevel.Debug))
+            {
+                var json = JsonSerializer.Serialize(comparison);
+                _logger.LogDebug("Comparison result: {Json}", json);
+            }
             
             // TODO: Implement persistent storage for comparison analysis
         }